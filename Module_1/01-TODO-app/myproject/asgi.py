@@ -12,5 +12,21 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+# Read by the settings to pick defaults that suit ASGI (see DB_CONN_MAX_AGE).
+os.environ.setdefault('SERVER_INTERFACE', 'asgi')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up.
+from django.urls import reverse  # noqa: E402
+
+from todo_app.streams import event_stream  # noqa: E402
+
+EVENTS_PATH = reverse('todo_events')
+
+
+async def application(scope, receive, send):
+    # The live-update stream bypasses the middleware (see todo_app/streams.py).
+    if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+        return await event_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,6 +44,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # GZip before ConditionalGet, so ETags are computed on the plain body.
+    'django.middleware.gzip.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -51,6 +55,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Opt-in request profiling: Server-Timing headers plus a rolling buffer of
+# timings shown to staff at todos/perf/. Sample a fraction of requests in
+# production to keep the overhead negligible.
+TODO_PROFILING_ENABLED = config('TODO_PROFILING_ENABLED', default=False, cast=bool)
+TODO_PROFILING_SAMPLE_RATE = config('TODO_PROFILING_SAMPLE_RATE', default=1.0, cast=float)
+TODO_PROFILING_BUFFER_SIZE = config('TODO_PROFILING_BUFFER_SIZE', default=1000, cast=int)
+TODO_PROFILING_SLOW_QUERIES = config('TODO_PROFILING_SLOW_QUERIES', default=5, cast=int)
+
+if TODO_PROFILING_ENABLED:
+    MIDDLEWARE.insert(0, 'todo_app.middleware.RequestProfilingMiddleware')
+
 ROOT_URLCONF = 'myproject.urls'
 
 TEMPLATES = [
@@ -70,16 +85,141 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'myproject.wsgi.application'
 
+ASGI_APPLICATION = 'myproject.asgi.application'
+
+# Serve todo_app through the async views in todo_app/async_views.py. Only
+# worthwhile under ASGI; under WSGI each async view runs in its own event loop.
+TODO_ASYNC_VIEWS = config('TODO_ASYNC_VIEWS', default=False, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# DB_ENGINE selects "sqlite" (default) or "postgresql". Connections are kept
+# open for DB_CONN_MAX_AGE seconds and health-checked before reuse, unless
+# PostgreSQL connection pooling (DB_POOL) is on, which replaces them.
+# Under ASGI each request's ORM work runs in a fresh thread-sensitive
+# context, where persistent connections are neither reliably reused nor
+# closed, so there the default is 0 and DB_POOL is the way to reuse them.
+# myproject/asgi.py sets SERVER_INTERFACE=asgi.
+
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+SERVER_INTERFACE = config('SERVER_INTERFACE', default='wsgi')
+if SERVER_INTERFACE not in ('wsgi', 'asgi'):
+    raise ImproperlyConfigured(
+        f"SERVER_INTERFACE must be 'wsgi' or 'asgi', not {SERVER_INTERFACE!r}."
+    )
+DB_CONN_MAX_AGE = config(
+    'DB_CONN_MAX_AGE', default=0 if SERVER_INTERFACE == 'asgi' else 60, cast=int
+)
+
+if DB_ENGINE == 'postgresql':
+    DB_POOL = config('DB_POOL', default=False, cast=bool)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='todo_app'),
+            'USER': config('DB_USER', default=''),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'OPTIONS': {},
+        }
+    }
+    if DB_POOL:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+elif DB_ENGINE == 'sqlite':
+    # The pragmas run on every new connection. WAL lets readers proceed
+    # while a writer holds the lock, busy_timeout makes writers wait for the
+    # lock instead of failing with "database is locked", and IMMEDIATE
+    # transactions take the write lock up front so two writers cannot
+    # deadlock upgrading from a read lock.
+    SQLITE_PRAGMAS = {
+        'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+        'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+        'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+    }
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'OPTIONS': {
+                'init_command': ';'.join(
+                    f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()
+                ),
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(
+        f"DB_ENGINE must be 'sqlite' or 'postgresql', not {DB_ENGINE!r}."
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'todo-app',
+        }
     }
-}
+
+# Rendered todo list pages and per-item fragments are cached and invalidated
+# by Todo post_save/post_delete signals (see todo_app/caching.py).
+TODO_CACHE_ENABLED = config('TODO_CACHE_ENABLED', default=True, cast=bool)
+TODO_CACHE_TIMEOUT = config('TODO_CACHE_TIMEOUT', default=3600, cast=int)
+
+
+# Admin for large Todo tables: estimated pagination counts (exact up to
+# TODO_ADMIN_COUNT_CAP rows, which also caps the archive page's count),
+# date_hierarchy navigation, full-text search and bulk actions instead of
+# list_editable (see todo_app/admin.py and todo_app/pagination.py).
+TODO_ADMIN_HIGH_VOLUME = config('TODO_ADMIN_HIGH_VOLUME', default=False, cast=bool)
+TODO_ADMIN_COUNT_CAP = config('TODO_ADMIN_COUNT_CAP', default=10000, cast=int)
+
+
+# Dashboard counts are kept per due date in TodoSummary and updated
+# incrementally; the histogram shows this many days ahead (see
+# todo_app/dashboard.py and the reconcile_todo_stats command).
+TODO_DASHBOARD_DAYS = config('TODO_DASHBOARD_DAYS', default=14, cast=int)
+
+# Resolved todos untouched for this many days are moved to ArchivedTodo by
+# the archive_todos command (see todo_app/archive.py).
+TODO_ARCHIVE_DAYS = config('TODO_ARCHIVE_DAYS', default=30, cast=int)
+
+# Live updates pushed to open todo lists over server-sent events (ASGI
+# only). "local" delivers within one process; "redis" fans out across
+# workers and needs the redis package (see todo_app/events.py).
+TODO_EVENTS_BACKEND = config('TODO_EVENTS_BACKEND', default='local')
+if TODO_EVENTS_BACKEND not in ('local', 'redis'):
+    raise ImproperlyConfigured(
+        f"TODO_EVENTS_BACKEND must be 'local' or 'redis', not {TODO_EVENTS_BACKEND!r}."
+    )
+TODO_EVENTS_REDIS_URL = config('TODO_EVENTS_REDIS_URL', default='redis://localhost:6379/0')
+TODO_EVENTS_CHANNEL = config('TODO_EVENTS_CHANNEL', default='todo_app:events')
+TODO_EVENTS_KEEPALIVE = config('TODO_EVENTS_KEEPALIVE', default=15, cast=float)
 
 
 # Password validation
@@ -117,6 +257,26 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = config('STATIC_ROOT', default=str(BASE_DIR / 'staticfiles'))
+
+# Static files are always served by todo_app/assets.py, from STATIC_ROOT
+# when collected and from the app directories otherwise. Production static
+# pipeline: after `manage.py collectstatic`, files are stored under
+# content-hashed names with .gz (and .br, if brotli is installed) copies,
+# and served with far-future immutable Cache-Control headers.
+TODO_STATIC_PIPELINE = config('TODO_STATIC_PIPELINE', default=False, cast=bool)
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'todo_app.assets.CompressedManifestStaticFilesStorage' if TODO_STATIC_PIPELINE
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -14,10 +14,18 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from todo_app import assets
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('todos/', include('todo_app.urls')),
+    # Nothing else serves static files once DEBUG is off (runserver's own
+    # handler, used when DEBUG is on, answers these before the URLconf).
+    re_path(rf'^{re.escape(settings.STATIC_URL.lstrip("/"))}(?P<path>.+)$', assets.serve),
 ]
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TodoAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'todo_app'
+
+    def ready(self):
+        from . import profiling, signals  # noqa: F401
+
+        # Before any connection opens (the profiling tests enable the
+        # middleware through override_settings, so this does not check
+        # TODO_PROFILING_ENABLED).
+        profiling.instrument_queries()
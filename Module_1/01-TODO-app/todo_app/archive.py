@@ -0,0 +1,69 @@
+"""Moving old resolved todos to ArchivedTodo and back.
+
+archive_resolved() works in batches of ``batch_size`` rows, each copied
+and deleted in its own transaction, so a long run never holds locks for
+more than one batch and can be stopped at any point. Each batch is
+deleted without the per-row delete signals: the dashboard counters and
+caches are updated once per batch instead, and no live events are sent,
+so open pages drop archived todos on their next load. Archived todos no
+longer count towards the dashboard.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, dashboard
+from .models import ArchivedTodo, Todo
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def archivable(days, now=None):
+    """Resolved todos last changed more than ``days`` days ago."""
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return Todo.objects.filter(is_resolved=True, updated_at__lt=cutoff).order_by('pk')
+
+
+def archive_resolved(days, batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Archive resolved todos older than ``days`` days; return how many."""
+    candidates = archivable(days, now)
+    archived = 0
+    while True:
+        with transaction.atomic():
+            batch = list(candidates.select_for_update()[:batch_size])
+            if not batch:
+                break
+            pks = [todo.pk for todo in batch]
+            ArchivedTodo.objects.bulk_create([ArchivedTodo.from_todo(todo) for todo in batch])
+            # The batch is locked, so its rows are exactly what is deleted.
+            # _raw_delete() is private API, used deliberately: it is the
+            # single DELETE that QuerySet.delete() issues when there are no
+            # signal receivers or cascades, without the receivers (which
+            # would update the counters and publish events row by row).
+            # Nothing references Todo, so there is nothing to cascade.
+            # TodoArchiveTests pins both the single query and the silence.
+            deleted = Todo.objects.filter(pk__in=pks)
+            deleted._raw_delete(deleted.db)
+            dashboard.apply(dashboard.changes_for_deleted(batch))
+            caching.after_commit(caching.invalidate_todos, pks)
+        archived += len(batch)
+    return archived
+
+
+def restore(archived_todos):
+    """Move ``archived_todos`` back into the Todo table; return how many."""
+    restored = 0
+    for archived in archived_todos:
+        with transaction.atomic():
+            todo = archived.to_todo()
+            todo.save(force_insert=True)
+            # auto_now_add stamped the restore time; put the original back.
+            Todo.objects.filter(pk=todo.pk).update(created_at=archived.created_at)
+            archived.delete()
+        restored += 1
+    if restored:
+        # Pages rendered while the transactions were open may have cached
+        # the list without the restored todos.
+        caching.after_commit(caching.invalidate_list)
+    return restored
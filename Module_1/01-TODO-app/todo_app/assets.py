@@ -0,0 +1,145 @@
+"""Fingerprinted, precompressed static files and a view that serves them.
+
+With TODO_STATIC_PIPELINE on, ``collectstatic`` stores every file under a
+content-hashed name (ManifestStaticFilesStorage) and writes gzip and, if
+the optional ``brotli`` package is installed, brotli copies next to each
+text asset. ``serve`` sends the smallest variant the client accepts, and
+marks hashed names as immutable, since their content can never change.
+
+``serve`` is routed at STATIC_URL whatever the settings, so pages are
+styled without a separate static server. Files that were never collected
+are found in the app directories instead, as the development server does.
+"""
+import gzip
+import mimetypes
+import posixpath
+from pathlib import Path
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.html')
+# Variants that save less than this share of the original are not kept.
+MIN_SAVING = 0.05
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Unhashed names can change on the next deploy, so they are cached briefly.
+MUTABLE_MAX_AGE = 60
+
+
+def encodings():
+    """(file suffix, Content-Encoding) pairs, preferred first."""
+    variants = [('.gz', 'gzip')]
+    if brotli is not None:
+        variants.insert(0, ('.br', 'br'))
+    return variants
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes .gz/.br copies."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if not name.endswith(COMPRESSIBLE) or not self.exists(name):
+                continue
+            for compressed_name in self.write_compressed(name):
+                yield name, compressed_name, True
+
+    def write_compressed(self, name):
+        """Write every worthwhile compressed variant of ``name``."""
+        path = Path(self.path(name))
+        data = path.read_bytes()
+        for suffix, encoding in encodings():
+            compressed = compress(data, encoding)
+            target = path.with_name(path.name + suffix)
+            if len(compressed) <= len(data) * (1 - MIN_SAVING):
+                target.write_bytes(compressed)
+                yield name + suffix
+            elif target.exists():
+                # Left over from an earlier collectstatic.
+                target.unlink()
+
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for part in header.split(','):
+        coding, *params = [item.strip() for item in part.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def is_hashed(path):
+    """Whether ``path`` is a fingerprinted name from the manifest."""
+    return path in getattr(staticfiles_storage, 'hashed_files', {}).values()
+
+
+def locate(path):
+    """The file for ``path`` in STATIC_ROOT, else in the apps; or None."""
+    try:
+        full_path = Path(staticfiles_storage.path(path))
+        if full_path.is_file():
+            return full_path
+        found = finders.find(posixpath.normpath(path).lstrip('/'))
+    except (NotImplementedError, SuspiciousFileOperation):
+        return None
+    return Path(found) if found else None
+
+
+def serve(request, path):
+    """Serve a static file, preferring the collected copy in STATIC_ROOT."""
+    full_path = locate(path)
+    if full_path is None:
+        raise Http404(path)
+
+    served, content_encoding = full_path, None
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    for suffix, encoding in encodings():
+        variant = full_path.with_name(full_path.name + suffix)
+        if encoding in accepted and variant.is_file():
+            served, content_encoding = variant, encoding
+            break
+
+    content_type, _ = mimetypes.guess_type(full_path.name)
+    response = FileResponse(
+        served.open('rb'),
+        content_type=content_type or 'application/octet-stream',
+        filename=full_path.name,
+    )
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    # Variants exist only for some files, but caches cannot know that.
+    patch_vary_headers(response, ['Accept-Encoding'])
+    response['Last-Modified'] = http_date(full_path.stat().st_mtime)
+    if is_hashed(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=MUTABLE_MAX_AGE)
+    return response
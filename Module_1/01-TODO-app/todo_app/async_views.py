@@ -0,0 +1,91 @@
+"""Async equivalents of the views in views.py.
+
+Selected with ``TODO_ASYNC_VIEWS = True``. Under ASGI these run on the
+event loop and use the async ORM, so a request does not need a
+sync_to_async thread hop to reach the view. Reading the page, fragment
+and dashboard caches blocks (on file I/O with the file backend), so the
+list and fragment renders that do it run in one thread hop each.
+"""
+from asgiref.sync import sync_to_async
+from django.forms import modelform_factory
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.views.decorators.csrf import ensure_csrf_cookie
+
+from . import caching, dashboard, transfer
+from .models import Todo
+from .views import export_response, form_errors, todo_fragment, toggle_todo, wants_fragment
+
+TodoCreateForm = modelform_factory(Todo, fields=['title', 'description', 'due_date'])
+TodoUpdateForm = modelform_factory(Todo, fields=['title', 'description', 'due_date', 'is_resolved'])
+
+
+def render_list(request, todos):
+    response = render(
+        request, 'todo_app/todo_list.html', {'todos': todos, 'dashboard': dashboard.get_dashboard()}
+    )
+    caching.set_page(request, response.content)
+    return response
+
+
+def render_fragment(request, todo, status=200):
+    return todo_fragment(request, todo, dashboard.get_dashboard(), status=status)
+
+
+@ensure_csrf_cookie
+async def todo_list(request):
+    content = await sync_to_async(caching.get_page)(request)
+    if content is not None:
+        return HttpResponse(content)
+    todos = [todo async for todo in Todo.objects.all().aiterator()]
+    return await sync_to_async(render_list)(request, todos)
+
+
+async def todo_create(request):
+    if request.method == 'POST':
+        form = TodoCreateForm(request.POST)
+        if form.is_valid():
+            todo = form.save(commit=False)
+            await todo.asave()
+            if wants_fragment(request):
+                return await sync_to_async(render_fragment)(request, todo, status=201)
+            return redirect('todo_list')
+        if wants_fragment(request):
+            return form_errors(form)
+    else:
+        form = TodoCreateForm()
+    return render(request, 'todo_app/todo_form.html', {'form': form})
+
+
+async def todo_update(request, pk):
+    todo = await aget_object_or_404(Todo, pk=pk)
+    if request.method == 'POST':
+        form = TodoUpdateForm(request.POST, instance=todo)
+        if form.is_valid():
+            await form.save(commit=False).asave()
+            return redirect('todo_list')
+    else:
+        form = TodoUpdateForm(instance=todo)
+    return render(request, 'todo_app/todo_form.html', {'form': form, 'object': todo, 'todo': todo})
+
+
+async def todo_delete(request, pk):
+    todo = await aget_object_or_404(Todo, pk=pk)
+    if request.method == 'POST':
+        await todo.adelete()
+        if wants_fragment(request):
+            return HttpResponse(status=204)
+        return redirect('todo_list')
+    return render(request, 'todo_app/todo_confirm_delete.html', {'object': todo, 'todo': todo})
+
+
+async def toggle_resolved(request, pk):
+    # The flip needs a transaction, which the async ORM cannot hold open.
+    todo = await sync_to_async(toggle_todo)(pk)
+    if wants_fragment(request):
+        return await sync_to_async(render_fragment)(request, todo)
+    return redirect('todo_list')
+
+
+async def export_todos(request):
+    return export_response(request, transfer.aexport_lines)
@@ -0,0 +1,257 @@
+"""In-process WSGI and ASGI drivers for benchmarking the todo views.
+
+Requests are handed straight to Django's WSGIHandler / ASGIHandler, so
+the numbers measure Django and the database rather than a web server or
+the network. WSGI traffic is spread over a thread pool, ASGI traffic over
+asyncio tasks on a single event loop.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import CommandError
+from django.db import connection, connections
+from django.middleware.csrf import _get_new_csrf_string
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+HOST = 'testserver'
+
+# mode -> (server interface, TODO_ASYNC_VIEWS)
+MODES = {
+    'wsgi': ('wsgi', False),
+    'asgi-sync': ('asgi', False),
+    'asgi-async': ('asgi', True),
+}
+
+# Name of the Request being handled, visible to signal handlers and
+# database wrappers running on behalf of it (threads included).
+current_request = ContextVar('current_request', default=None)
+
+
+@dataclass
+class Request:
+    name: str
+    method: str
+    path: str
+    data: dict | None = None
+
+
+@dataclass
+class Response:
+    name: str
+    status: int
+    seconds: float
+
+
+class WSGIDriver:
+    """Send requests to a WSGIHandler from any number of threads."""
+
+    def __init__(self):
+        self.app = WSGIHandler()
+        self.csrf_token = _get_new_csrf_string()
+        self.factory = RequestFactory(HTTP_COOKIE=f'csrftoken={self.csrf_token}')
+
+    def send(self, request):
+        if request.method == 'POST':
+            data = {**(request.data or {}), 'csrfmiddlewaretoken': self.csrf_token}
+            environ = self.factory.post(request.path, data).environ
+        else:
+            environ = self.factory.generic(request.method, request.path).environ
+        status = []
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(int(status_line.split(' ', 1)[0]))
+
+        current_request.set(request.name)
+        start = time.perf_counter()
+        body = self.app(environ, start_response)
+        try:
+            for _ in body:
+                pass
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        return Response(request.name, status[0], time.perf_counter() - start)
+
+
+class ASGIDriver:
+    """Send requests to an ASGIHandler from coroutines on one event loop."""
+
+    def __init__(self):
+        self.app = ASGIHandler()
+        self.csrf_token = _get_new_csrf_string()
+
+    def _scope(self, request, body):
+        headers = [
+            (b'host', HOST.encode()),
+            (b'cookie', f'csrftoken={self.csrf_token}'.encode()),
+        ]
+        if body:
+            headers += [
+                (b'content-type', b'application/x-www-form-urlencoded'),
+                (b'content-length', str(len(body)).encode()),
+            ]
+        path, _, query = request.path.partition('?')
+        return {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': request.method,
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': headers,
+            'client': ('127.0.0.1', 0),
+            'server': (HOST, 80),
+        }
+
+    async def send(self, request):
+        body = b''
+        if request.method == 'POST':
+            data = {**(request.data or {}), 'csrfmiddlewaretoken': self.csrf_token}
+            body = urlencode(data).encode()
+        sent_body = False
+        disconnect = asyncio.Event()
+        status = []
+
+        async def receive():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        current_request.set(request.name)
+        start = time.perf_counter()
+        await self.app(self._scope(request, body), receive, send)
+        disconnect.set()
+        return Response(request.name, status[0], time.perf_counter() - start)
+
+
+def run_wsgi(requests, concurrency):
+    """Replay ``requests`` through WSGI; return (responses, wall seconds)."""
+    driver = WSGIDriver()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        responses = list(pool.map(driver.send, requests))
+        seconds = time.perf_counter() - start
+        # Persistent connections outlive the requests; close the one held by
+        # every worker thread so the database can be dropped afterwards.
+        barrier = threading.Barrier(concurrency)
+
+        def close_connections(_):
+            barrier.wait()
+            connections.close_all()
+
+        list(pool.map(close_connections, range(concurrency)))
+    return responses, seconds
+
+
+def run_asgi(requests, concurrency):
+    """Replay ``requests`` through ASGI; return (responses, wall seconds)."""
+    driver = ASGIDriver()
+
+    async def main():
+        queue = list(reversed(requests))
+        responses = []
+
+        async def worker():
+            while queue:
+                responses.append(await driver.send(queue.pop()))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        seconds = time.perf_counter() - start
+        await sync_to_async(connections.close_all)()
+        return responses, seconds
+
+    return asyncio.run(main())
+
+
+def run(interface, requests, concurrency):
+    """Replay ``requests`` through the given interface ('wsgi' or 'asgi')."""
+    runner = run_wsgi if interface == 'wsgi' else run_asgi
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, HOST]):
+        return runner(requests, concurrency)
+
+
+def check_mode(mode):
+    """Fail unless this process is configured for ``mode``; return its interface."""
+    interface, async_views = MODES[mode]
+    if settings.TODO_ASYNC_VIEWS != async_views:
+        raise CommandError(f'{mode} needs TODO_ASYNC_VIEWS={async_views}')
+    return interface
+
+
+@contextmanager
+def throwaway_database():
+    """Create, migrate and finally drop a test database for one run."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if connection.vendor == 'sqlite':
+            # A file database, so concurrent writers see real locking.
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tmpdir, 'bench.sqlite3')
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False,
+        )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def spawn(command, mode, arguments, env=None):
+    """Run ``manage.py <command> --mode <mode>`` in a child process.
+
+    Each mode needs its own process because TODO_ASYNC_VIEWS decides the
+    URLconf at import time. The child prints its result as JSON on the last
+    line of stdout.
+    """
+    env = {**os.environ, **(env or {}), 'TODO_ASYNC_VIEWS': str(MODES[mode][1])}
+    completed = subprocess.run(
+        [sys.executable, '-m', 'django', command, '--mode', mode, *arguments],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode:
+        raise CommandError(f'{mode} run failed:\n{completed.stderr}')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def parse_modes(value):
+    modes = value.split(',')
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        raise CommandError(f'Unknown mode(s): {", ".join(sorted(unknown))}')
+    return modes
+
+
+def summarize(responses, seconds):
+    latencies = sorted(response.seconds for response in responses)
+    return {
+        'requests': len(responses),
+        'seconds': seconds,
+        'rps': len(responses) / seconds if seconds else 0.0,
+        'mean_ms': 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+        'errors': sum(1 for response in responses if response.status >= 400),
+    }
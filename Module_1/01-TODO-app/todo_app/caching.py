@@ -0,0 +1,182 @@
+"""Caching for the todo list page and its per-item fragments.
+
+Whole pages are keyed by a list "generation" that is bumped whenever any
+Todo changes, so every cached variant of the list goes stale at once.
+Item fragments are keyed by primary key and deleted individually; they
+also carry a generation of their own so that bulk updates, which send no
+signals, can expire all of them at once. A page reads and writes all of
+its fragments in one get_many()/set_many() each.
+Writes expire entries through after_commit(), so nothing cached from the
+rows as they were before a transaction committed outlives the commit.
+Hit/miss counters are kept in the cache itself so that every process
+sharing a backend reports the same numbers.
+"""
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+KEY_PREFIX = 'todo_app'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+ITEM_GENERATION_KEY = f'{KEY_PREFIX}:item_generation'
+KINDS = ('page', 'item')
+
+
+def is_enabled():
+    return getattr(settings, 'TODO_CACHE_ENABLED', True)
+
+
+def _timeout():
+    return getattr(settings, 'TODO_CACHE_TIMEOUT', 3600)
+
+
+def _new_generation(key):
+    generation = time.time_ns()
+    cache.set(key, generation, None)
+    return generation
+
+
+def _generation(key):
+    generation = cache.get(key)
+    if generation is None:
+        generation = _new_generation(key)
+    return generation
+
+
+def _bump_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        _new_generation(key)
+
+
+def list_generation():
+    return _generation(GENERATION_KEY)
+
+
+def item_generation():
+    return _generation(ITEM_GENERATION_KEY)
+
+
+def page_key(request):
+    # Pages show an overdue count, so they also go stale at midnight. The
+    # list ignores query strings, so they must not multiply the entries.
+    path = hashlib.md5(request.path.encode()).hexdigest()
+    return f'{KEY_PREFIX}:page:{list_generation()}:{timezone.localdate().isoformat()}:{path}'
+
+
+def item_key(pk, generation=None):
+    if generation is None:
+        generation = item_generation()
+    return f'{KEY_PREFIX}:item:{generation}:{pk}'
+
+
+def _counter_key(kind, outcome):
+    return f'{KEY_PREFIX}:stats:{kind}:{outcome}'
+
+
+def _record(kind, hits, misses):
+    for outcome, count in (('hits', hits), ('misses', misses)):
+        if not count:
+            continue
+        key = _counter_key(kind, outcome)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            # Evicted between add() and incr(); losing a sample is fine.
+            pass
+
+
+def get_page(request):
+    """Return the cached HTML for this list request, or None."""
+    if not is_enabled():
+        return None
+    content = cache.get(page_key(request))
+    _record('page', content is not None, content is None)
+    return content
+
+
+def set_page(request, content):
+    if is_enabled():
+        cache.set(page_key(request), content, _timeout())
+
+
+def get_items(pks, generation=None):
+    """Return ``{pk: HTML fragment}`` for the todos in ``pks`` that are cached."""
+    if not is_enabled():
+        return {}
+    if generation is None:
+        generation = item_generation()
+    keys = {item_key(pk, generation): pk for pk in pks}
+    contents = {keys[key]: content for key, content in cache.get_many(keys).items()}
+    _record('item', len(contents), len(keys) - len(contents))
+    return contents
+
+
+def set_items(contents, generation=None):
+    """Cache ``{pk: HTML fragment}``."""
+    if is_enabled() and contents:
+        if generation is None:
+            generation = item_generation()
+        cache.set_many(
+            {item_key(pk, generation): content for pk, content in contents.items()}, _timeout()
+        )
+
+
+def invalidate_list():
+    """Expire every cached list page."""
+    _bump_generation(GENERATION_KEY)
+
+
+def invalidate_todos(pks):
+    """Expire the fragments for ``pks`` and every cached list page."""
+    generation = item_generation()
+    cache.delete_many([item_key(pk, generation) for pk in pks])
+    invalidate_list()
+
+
+def invalidate_all():
+    """Expire every list page and every item fragment."""
+    _bump_generation(ITEM_GENERATION_KEY)
+    invalidate_list()
+
+
+def after_commit(invalidate, *args):
+    """Run ``invalidate(*args)`` now and, inside a transaction, on commit.
+
+    The first run keeps the writing transaction from reading its own stale
+    entries. Until the commit, other requests still see the old rows and
+    may cache them under the new generation; the second run expires those.
+    """
+    invalidate(*args)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(invalidate, *args))
+
+
+def get_stats():
+    """Return hit/miss counters and hit rates for pages and fragments."""
+    counters = cache.get_many(
+        [_counter_key(kind, outcome) for kind in KINDS for outcome in ('hits', 'misses')]
+    )
+    stats = {}
+    for kind in KINDS:
+        hits = counters.get(_counter_key(kind, 'hits'), 0)
+        misses = counters.get(_counter_key(kind, 'misses'), 0)
+        total = hits + misses
+        stats[kind] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+        }
+    return stats
+
+
+def reset_stats():
+    cache.delete_many(
+        [_counter_key(kind, outcome) for kind in KINDS for outcome in ('hits', 'misses')]
+    )
@@ -0,0 +1,187 @@
+"""Pending/resolved/overdue statistics for the top of the todo list.
+
+Counts live in TodoSummary, one row per due date, and are adjusted with
+F() updates whenever a todo is created, changed, deleted or bulk-updated,
+so no request ever aggregates over the Todo table. The rendered numbers
+are cached per day (overdue depends on the date); reconcile() rebuilds
+the summaries from scratch to repair any drift.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import caching
+from .models import Todo, TodoSummary
+
+DASHBOARD_KEY = f'{caching.KEY_PREFIX}:dashboard'
+
+
+def state(todo):
+    """The part of a todo the summaries depend on."""
+    return (todo.due_date, todo.is_resolved)
+
+
+def changes_for(old, new):
+    """Summary changes for one todo moving from state ``old`` to ``new``.
+
+    Either state may be None for a todo that is being created or deleted.
+    Returns ``{due_date: (pending delta, resolved delta)}``; the deltas are
+    indexed by is_resolved, so False is pending and True is resolved.
+    """
+    changes = defaultdict(lambda: [0, 0])
+    if old is not None:
+        due_date, is_resolved = old
+        changes[due_date][is_resolved] -= 1
+    if new is not None:
+        due_date, is_resolved = new
+        changes[due_date][is_resolved] += 1
+    return {due_date: tuple(delta) for due_date, delta in changes.items() if any(delta)}
+
+
+def changes_for_created(todos):
+    """Summary changes for a batch of newly created todos."""
+    return _changes_for_batch(todos, 1)
+
+
+def changes_for_deleted(todos):
+    """Summary changes for a batch of deleted todos."""
+    return _changes_for_batch(todos, -1)
+
+
+def _changes_for_batch(todos, sign):
+    changes = defaultdict(lambda: [0, 0])
+    for todo in todos:
+        changes[todo.due_date][todo.is_resolved] += sign
+    return {due_date: tuple(delta) for due_date, delta in changes.items()}
+
+
+def changes_for_resolution(queryset, is_resolved):
+    """Summary changes for setting is_resolved on every todo in ``queryset``.
+
+    ``queryset`` must only contain todos whose status actually changes.
+    """
+    sign = 1 if is_resolved else -1
+    rows = queryset.order_by().values('due_date').annotate(count=Count('pk'))
+    return {row['due_date']: (-sign * row['count'], sign * row['count']) for row in rows}
+
+
+def apply(changes):
+    """Add ``{due_date: (pending, resolved)}`` deltas to the summaries."""
+    for due_date, (pending, resolved) in changes.items():
+        summaries = TodoSummary.objects.filter(
+            **({'due_date': due_date} if due_date else {'due_date__isnull': True})
+        )
+        values = {'pending': F('pending') + pending, 'resolved': F('resolved') + resolved}
+        if summaries.update(**values):
+            continue
+        try:
+            with transaction.atomic():
+                TodoSummary.objects.create(due_date=due_date, pending=pending, resolved=resolved)
+        except IntegrityError:
+            # Another request created the row first.
+            summaries.update(**values)
+    if changes:
+        caching.after_commit(invalidate)
+
+
+def _cache_key(today):
+    return f'{DASHBOARD_KEY}:{today.isoformat()}'
+
+
+def invalidate():
+    cache.delete(_cache_key(timezone.localdate()))
+
+
+def get_dashboard():
+    """Return the dashboard numbers, from the cache when possible."""
+    today = timezone.localdate()
+    if caching.is_enabled():
+        dashboard = cache.get(_cache_key(today))
+        if dashboard is not None:
+            return dashboard
+    dashboard = compute(today)
+    if caching.is_enabled():
+        cache.set(_cache_key(today), dashboard, settings.TODO_CACHE_TIMEOUT)
+    return dashboard
+
+
+def compute(today):
+    """Build the dashboard from the summaries (one small query)."""
+    summaries = TodoSummary.objects.filter(Q(pending__gt=0) | Q(resolved__gt=0))
+    horizon = today + timedelta(days=settings.TODO_DASHBOARD_DAYS)
+    pending = resolved = overdue = 0
+    undated = [0, 0]
+    upcoming = []
+    for summary in summaries:
+        # Drifted counters can go negative until reconcile() runs; never
+        # show fewer than zero todos.
+        summary_pending, summary_resolved = max(summary.pending, 0), max(summary.resolved, 0)
+        pending += summary_pending
+        resolved += summary_resolved
+        if summary.due_date is None:
+            undated[0] += summary_pending
+            undated[1] += summary_resolved
+        elif summary.due_date < today:
+            overdue += summary_pending
+        elif summary.due_date < horizon:
+            upcoming.append((summary.due_date, summary_pending, summary_resolved))
+
+    histogram = [{'label': 'No due date', 'pending': undated[0], 'resolved': undated[1]}]
+    histogram.append({'label': 'Overdue', 'pending': overdue, 'resolved': 0, 'overdue': True})
+    histogram += [
+        {'label': due_date, 'pending': bucket_pending, 'resolved': bucket_resolved}
+        for due_date, bucket_pending, bucket_resolved in sorted(upcoming)
+    ]
+    histogram = [bucket for bucket in histogram if bucket['pending'] or bucket['resolved']]
+    largest = max((bucket['pending'] + bucket['resolved'] for bucket in histogram), default=0)
+    for bucket in histogram:
+        total = bucket['pending'] + bucket['resolved']
+        bucket['percent'] = round(100 * total / largest) if largest > 0 else 0
+    return {
+        'pending': pending,
+        'resolved': resolved,
+        'overdue': overdue,
+        'histogram': histogram,
+    }
+
+
+def reconcile():
+    """Rebuild the summaries from the Todo table; return rows corrected."""
+    with transaction.atomic():
+        actual = {
+            row['due_date']: (row['pending'], row['resolved'])
+            for row in Todo.objects.order_by().values('due_date').annotate(
+                pending=Count('pk', filter=Q(is_resolved=False)),
+                resolved=Count('pk', filter=Q(is_resolved=True)),
+            )
+        }
+        corrected = 0
+        seen = set()
+        for summary in TodoSummary.objects.select_for_update():
+            expected = actual.get(summary.due_date, (0, 0))
+            if summary.due_date in seen or expected == (0, 0):
+                # A duplicate "no due date" row (from before migration
+                # 0005 made it unique), or a bucket that has emptied out.
+                if summary.due_date in seen or summary.pending or summary.resolved:
+                    corrected += 1
+                summary.delete()
+                continue
+            seen.add(summary.due_date)
+            if (summary.pending, summary.resolved) != expected:
+                summary.pending, summary.resolved = expected
+                summary.save(update_fields=['pending', 'resolved'])
+                corrected += 1
+        missing = [
+            TodoSummary(due_date=due_date, pending=pending, resolved=resolved)
+            for due_date, (pending, resolved) in actual.items()
+            if due_date not in seen
+        ]
+        TodoSummary.objects.bulk_create(missing)
+        corrected += len(missing)
+    invalidate()
+    return corrected
@@ -0,0 +1,234 @@
+"""Live todo events for the server-sent event stream (see streams.py).
+
+Todo signals publish one event per create, update, toggle and delete,
+after the transaction commits, carrying the re-rendered item and
+dashboard so clients can patch their page without fetching anything.
+Events go through a backend to the ``hub`` of every process, which hands
+them to the SSE streams connected there:
+
+    local   delivers within this process only (default; enough for a
+            single ASGI worker, and the stand-in for Redis in tests)
+    redis   Redis pub/sub, so streams on every worker see every event;
+            needs the optional ``redis`` package
+
+Selected with TODO_EVENTS_BACKEND.
+"""
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from . import dashboard
+
+logger = logging.getLogger(__name__)
+
+# Events a slow client may fall behind by before its stream is closed;
+# EventSource reconnects and the page reloads its state.
+QUEUE_SIZE = 100
+# Seconds the Redis listener waits before reconnecting, doubling after
+# each consecutive failure up to the maximum.
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+# Seconds Redis gets to accept a connection or answer a command.
+SOCKET_TIMEOUT = 2
+# Events waiting to be sent to Redis before new ones are dropped.
+PUBLISH_QUEUE_SIZE = 1000
+
+
+class Subscription:
+    """Events for one SSE stream, read on the stream's event loop."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, message):
+        # Runs on self.loop.
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        """The next message, or None once the subscriber has fallen behind."""
+        return await self.queue.get()
+
+
+class Hub:
+    """Fans messages out to the subscriptions in this process.
+
+    deliver() may be called from any thread (the ORM runs signals in
+    worker threads under ASGI); each message is handed to its
+    subscription's event loop with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def listeners(self):
+        return len(self._subscriptions)
+
+    def deliver(self, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # The subscriber's loop has shut down.
+                self.unsubscribe(subscription)
+
+
+class LocalBackend:
+    """Delivers events to this process's hub only."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def has_listeners(self):
+        return self.hub.listeners > 0
+
+    def publish(self, message):
+        self.hub.deliver(message)
+
+    def start(self):
+        pass
+
+
+class RedisBackend:
+    """Publishes events on a Redis channel that every process listens to.
+
+    publish() only queues the message: a publisher thread sends it, so a
+    slow or unreachable Redis never holds up the write that triggered the
+    event. Messages are dropped while the queue is full.
+    """
+
+    def __init__(self, hub, url=None, channel=None, client=None, listen_client=None):
+        if client is None:
+            import redis
+
+            url = url or settings.TODO_EVENTS_REDIS_URL
+            client = redis.Redis.from_url(
+                url, socket_connect_timeout=SOCKET_TIMEOUT, socket_timeout=SOCKET_TIMEOUT
+            )
+            # The listener blocks reading the channel for as long as it is
+            # quiet, so it has no read timeout.
+            listen_client = redis.Redis.from_url(
+                url, socket_connect_timeout=SOCKET_TIMEOUT, socket_keepalive=True
+            )
+        self.hub = hub
+        self.client = client
+        self.listen_client = listen_client or client
+        self.channel = channel or settings.TODO_EVENTS_CHANNEL
+        self._outbox = queue.Queue(PUBLISH_QUEUE_SIZE)
+        self._listener = None
+        self._publisher = None
+        self._lock = threading.Lock()
+
+    def has_listeners(self):
+        # Other processes may have streams open.
+        return True
+
+    def publish(self, message):
+        with self._lock:
+            if self._publisher is None:
+                self._publisher = threading.Thread(target=self._send, name='todo-events-publisher', daemon=True)
+                self._publisher.start()
+        try:
+            self._outbox.put_nowait(message)
+        except queue.Full:
+            logger.warning('Todo event queue is full; dropping an event')
+
+    def _send(self):
+        while True:
+            message = self._outbox.get()
+            try:
+                self.client.publish(self.channel, message)
+            except Exception:
+                logger.exception('Could not publish a todo event')
+            finally:
+                self._outbox.task_done()
+
+    def start(self):
+        """Start relaying the channel into the local hub (once)."""
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='todo-events', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        # The thread is started once per process, so it must outlive Redis
+        # restarts and network blips. Events published while it is
+        # disconnected are lost; EventSource clients only miss those.
+        delay = RECONNECT_DELAY
+        while True:
+            pubsub = self.listen_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                delay = RECONNECT_DELAY
+                for item in pubsub.listen():
+                    data = item['data']
+                    self.hub.deliver(data.decode() if isinstance(data, bytes) else data)
+            except Exception:
+                logger.exception('Lost the todo event channel; reconnecting in %s s', delay)
+            finally:
+                pubsub.close()
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'redis': RedisBackend,
+}
+
+hub = Hub()
+backend = BACKENDS[getattr(settings, 'TODO_EVENTS_BACKEND', 'local')](hub)
+
+
+def message(kind, pk, todo=None):
+    """Serialize an event about todo ``pk`` for the stream.
+
+    ``todo`` is rendered into the event; deletes have none.
+    """
+    event = {
+        'type': kind,
+        'id': pk,
+        'dashboard': render_to_string('todo_app/_dashboard.html', {'dashboard': dashboard.get_dashboard()}),
+    }
+    if todo is not None:
+        event['html'] = render_to_string('todo_app/_todo_item.html', {'todo': todo})
+    return json.dumps(event)
+
+
+def publish(kind, pk, todo=None):
+    """Send an event about todo ``pk`` to every connected stream."""
+    if not backend.has_listeners():
+        return
+    try:
+        backend.publish(message(kind, pk, todo))
+    except Exception:
+        # Live updates are best effort; never fail the write over them.
+        logger.exception('Could not publish todo %s event', kind)
@@ -0,0 +1,165 @@
+"""Mixed read/write load generation for the todo app.
+
+Builds a request mix over the list, create, toggle, update and delete
+endpoints, replays it through the in-process drivers in benchmark.py and
+reports per-endpoint throughput, latency percentiles, error and
+lock-contention rates and database query totals.
+"""
+import random
+import threading
+from collections import Counter
+
+from django.db import OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+
+from . import benchmark, dashboard, profiling
+from .models import Todo
+
+ENDPOINTS = ('list', 'create', 'toggle', 'update', 'delete')
+DEFAULT_MIX = 'list=60,create=10,toggle=15,update=10,delete=5'
+
+# Error messages that mean a request lost a fight for a database lock.
+LOCK_ERRORS = ('database is locked', 'database table is locked', 'deadlock detected', 'could not obtain lock')
+
+
+def parse_mix(value):
+    """Parse ``"list=60,create=10"`` into normalized weights per endpoint."""
+    weights = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f'Unknown endpoint {name!r}; expected one of {", ".join(ENDPOINTS)}')
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise ValueError(f'Invalid weight for {name!r}: {weight!r}') from None
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError('The mix needs at least one positive weight')
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def build_requests(mix, total, seed_todos, seed=0):
+    """Seed todos and return ``total`` requests drawn from ``mix``.
+
+    Deletes each get their own todo so none of them 404; toggles and
+    updates pick from todos that are never deleted.
+    """
+    rng = random.Random(seed)
+    names = rng.choices(list(mix), weights=list(mix.values()), k=total)
+    deletes = names.count('delete')
+    todos = Todo.objects.bulk_create(
+        Todo(title=f'Load test todo {i}') for i in range(max(seed_todos, deletes + 1))
+    )
+    # bulk_create() skips the signals that maintain the dashboard.
+    dashboard.apply(dashboard.changes_for_created(todos))
+    pks = list(Todo.objects.order_by('pk').values_list('pk', flat=True))
+    deletable, stable = pks[:deletes], pks[deletes:]
+    rng.shuffle(deletable)
+
+    requests = []
+    for i, name in enumerate(names):
+        if name == 'list':
+            request = benchmark.Request(name, 'GET', reverse('todo_list'))
+        elif name == 'create':
+            request = benchmark.Request(name, 'POST', reverse('todo_create'), {'title': f'Created {i}'})
+        elif name == 'toggle':
+            request = benchmark.Request(name, 'GET', reverse('todo_toggle', args=[rng.choice(stable)]))
+        elif name == 'update':
+            request = benchmark.Request(
+                name, 'POST', reverse('todo_update', args=[rng.choice(stable)]),
+                {'title': f'Updated {i}', 'description': 'Updated by the load test'},
+            )
+        else:
+            request = benchmark.Request(name, 'POST', reverse('todo_delete', args=[deletable.pop()]))
+        requests.append(request)
+    return requests
+
+
+class Instrumentation:
+    """Count queries and lock errors per endpoint while installed.
+
+    Both are observed in a database execute wrapper, which is added to
+    every connection, including the ones worker threads open later.
+    """
+
+    def __init__(self):
+        self.queries = Counter()
+        self.lock_errors = Counter()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def __enter__(self):
+        connection_created.connect(self._connection_created)
+        for conn in connections.all(initialized_only=True):
+            self._install(conn)
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self._connection_created)
+        for conn in self._connections:
+            if self._execute in conn.execute_wrappers:
+                conn.execute_wrappers.remove(self._execute)
+
+    def _install(self, conn):
+        if self._execute not in conn.execute_wrappers:
+            conn.execute_wrappers.append(self._execute)
+            with self._lock:
+                self._connections.append(conn)
+
+    def _connection_created(self, sender, connection, **kwargs):
+        self._install(connection)
+
+    def _execute(self, execute, sql, params, many, context):
+        name = benchmark.current_request.get()
+        if name is None:
+            return execute(sql, params, many, context)
+        with self._lock:
+            self.queries[name] += 1
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as exc:
+            if is_lock_error(exc):
+                with self._lock:
+                    self.lock_errors[name] += 1
+            raise
+
+
+def is_lock_error(exc):
+    message = str(exc).lower()
+    return any(lock_message in message for lock_message in LOCK_ERRORS)
+
+
+def report(responses, seconds, instrumentation):
+    """Summarize a run per endpoint, plus an ``all`` row."""
+    by_endpoint = {}
+    for response in responses:
+        by_endpoint.setdefault(response.name, []).append(response)
+    by_endpoint = {name: by_endpoint[name] for name in ENDPOINTS if name in by_endpoint}
+    by_endpoint['all'] = responses
+
+    rows = {}
+    for name, endpoint_responses in by_endpoint.items():
+        latencies = sorted(response.seconds * 1000 for response in endpoint_responses)
+        count = len(endpoint_responses)
+        errors = sum(1 for response in endpoint_responses if response.status >= 400)
+        if name == 'all':
+            lock_errors = sum(instrumentation.lock_errors.values())
+            queries = sum(instrumentation.queries.values())
+        else:
+            lock_errors = instrumentation.lock_errors[name]
+            queries = instrumentation.queries[name]
+        rows[name] = {
+            'requests': count,
+            'rps': count / seconds if seconds else 0.0,
+            'p50_ms': profiling.percentile(latencies, 0.50),
+            'p95_ms': profiling.percentile(latencies, 0.95),
+            'p99_ms': profiling.percentile(latencies, 0.99),
+            'error_rate': errors / count,
+            'lock_rate': lock_errors / count,
+            'queries': queries,
+            'queries_per_request': queries / count,
+        }
+    return rows
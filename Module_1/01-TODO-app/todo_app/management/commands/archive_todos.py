@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from todo_app import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Move resolved todos that have not changed for --days days into the '
+        'archive table, one transaction per batch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.TODO_ARCHIVE_DAYS,
+            help=f'Archive todos resolved longer ago than this (default: {settings.TODO_ARCHIVE_DAYS}).',
+        )
+        parser.add_argument('--batch-size', type=int, default=archive.DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many todos would be archived.',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archive.archivable(options['days']).count()
+            self.stdout.write(f'Would archive {count} todos')
+            return
+        archived = archive.archive_resolved(options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} todos'))
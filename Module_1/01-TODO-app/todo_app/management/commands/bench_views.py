@@ -0,0 +1,81 @@
+import argparse
+import json
+import random
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from todo_app import benchmark, dashboard
+from todo_app.models import Todo
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests per second of the todo views under WSGI and ASGI. '
+        'Each mode runs in its own process against a throwaway test database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes', default=','.join(benchmark.MODES),
+            help=f'Comma-separated modes to run (default: all of {", ".join(benchmark.MODES)}).',
+        )
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--todos', type=int, default=100, help='Todos to seed.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+        parser.add_argument('--mode', choices=benchmark.MODES, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            result = self.run_mode(options['mode'], options)
+            self.stdout.write(json.dumps(result))
+            return
+
+        arguments = [
+            '--requests', str(options['requests']),
+            '--concurrency', str(options['concurrency']),
+            '--todos', str(options['todos']),
+        ]
+        results = [
+            benchmark.spawn('bench_views', mode, arguments)
+            for mode in benchmark.parse_modes(options['modes'])
+        ]
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f'{"mode":<12}{"requests":>10}{"req/s":>10}{"mean ms":>10}{"errors":>8}')
+        for result in results:
+            self.stdout.write(
+                f'{result["mode"]:<12}{result["requests"]:>10}{result["rps"]:>10.1f}'
+                f'{result["mean_ms"]:>10.2f}{result["errors"]:>8}'
+            )
+
+    def run_mode(self, mode, options):
+        interface = benchmark.check_mode(mode)
+        with benchmark.throwaway_database():
+            requests = self.build_requests(options)
+            responses, seconds = benchmark.run(interface, requests, options['concurrency'])
+        return {'mode': mode, **benchmark.summarize(responses, seconds)}
+
+    def build_requests(self, options):
+        todos = Todo.objects.bulk_create(
+            Todo(title=f'Benchmark todo {i}') for i in range(options['todos'])
+        )
+        # bulk_create() skips the signals that maintain the dashboard.
+        dashboard.apply(dashboard.changes_for_created(todos))
+        pks = list(Todo.objects.values_list('pk', flat=True))
+        rng = random.Random(0)
+        requests = []
+        for i in range(options['requests']):
+            kind = i % 3
+            if kind == 0:
+                requests.append(benchmark.Request('list', 'GET', reverse('todo_list')))
+            elif kind == 1:
+                pk = rng.choice(pks)
+                requests.append(benchmark.Request('edit form', 'GET', reverse('todo_update', args=[pk])))
+            else:
+                pk = rng.choice(pks)
+                requests.append(benchmark.Request('toggle', 'GET', reverse('todo_toggle', args=[pk])))
+        return requests
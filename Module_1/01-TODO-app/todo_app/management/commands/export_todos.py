@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from todo_app import transfer
+
+
+class Command(BaseCommand):
+    help = 'Stream every todo to a CSV or JSONL file (or stdout) in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-o', '--output', default='-',
+            help='File to write; "-" (the default) writes to stdout.',
+        )
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS,
+            help='Output format; defaults to the output file extension, else csv.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=transfer.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or transfer.format_from_path(output)
+        lines = transfer.export_lines(fmt, chunk_size=options['chunk_size'])
+
+        if output == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(output, 'w', newline='', encoding='utf-8') as file:
+            file.writelines(lines)
+        self.stdout.write(self.style.SUCCESS(f'Exported todos to {output}'))
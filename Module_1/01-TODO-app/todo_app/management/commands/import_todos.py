@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_app import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Import todos from a CSV or JSONL export, streaming the input and '
+        'inserting it with batched bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='File to read; "-" reads from stdin.')
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS,
+            help='Input format; defaults to the input file extension, else csv.',
+        )
+        parser.add_argument('--batch-size', type=int, default=transfer.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['input']
+        fmt = options['format'] or transfer.format_from_path(path)
+        file = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            created = transfer.import_rows(
+                transfer.read_rows(fmt, file), batch_size=options['batch_size']
+            )
+        except transfer.RowError as exc:
+            message = f'Import stopped: {exc}.'
+            if exc.imported:
+                # Those batches are committed; re-running the same input
+                # would create them again.
+                message += (
+                    f' {exc.imported} todos up to line {exc.imported_through} were already'
+                    ' imported; remove those lines before importing the rest.'
+                )
+            else:
+                message += ' Nothing was imported.'
+            raise CommandError(message) from exc
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        self.stdout.write(self.style.SUCCESS(f'Imported {created} todos'))
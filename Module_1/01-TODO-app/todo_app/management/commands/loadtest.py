@@ -0,0 +1,100 @@
+import argparse
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from todo_app import benchmark, loadtest
+
+DATABASES = ('sqlite', 'postgresql')
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a mixed list/create/toggle/update/delete workload with many '
+        'concurrent clients against the app running in-process under WSGI '
+        'and ASGI, and report throughput, latency percentiles, error and '
+        'lock-contention rates and query totals per endpoint.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes', default='wsgi,asgi-async',
+            help=f'Comma-separated modes to run, from {", ".join(benchmark.MODES)} '
+                 '(default: wsgi,asgi-async).',
+        )
+        parser.add_argument(
+            '--db', choices=DATABASES,
+            help='Database backend for the throwaway test database '
+                 '(default: the configured DB_ENGINE).',
+        )
+        parser.add_argument(
+            '--mix', default=loadtest.DEFAULT_MIX,
+            help=f'Relative weight per endpoint (default: {loadtest.DEFAULT_MIX}).',
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients.')
+        parser.add_argument('--todos', type=int, default=500, help='Todos to seed.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the request mix.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+        parser.add_argument('--mode', choices=benchmark.MODES, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        try:
+            mix = loadtest.parse_mix(options['mix'])
+        except ValueError as exc:
+            raise CommandError(exc) from exc
+
+        if options['mode']:
+            self.stdout.write(json.dumps(self.run_mode(options['mode'], mix, options)))
+            return
+
+        arguments = [
+            '--mix', options['mix'],
+            '--requests', str(options['requests']),
+            '--concurrency', str(options['concurrency']),
+            '--todos', str(options['todos']),
+            '--seed', str(options['seed']),
+        ]
+        env = {'DB_ENGINE': options['db']} if options['db'] else None
+        results = [
+            benchmark.spawn('loadtest', mode, arguments, env=env)
+            for mode in benchmark.parse_modes(options['modes'])
+        ]
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for result in results:
+            self.write_table(result)
+
+    def run_mode(self, mode, mix, options):
+        interface = benchmark.check_mode(mode)
+        with benchmark.throwaway_database():
+            requests = loadtest.build_requests(mix, options['requests'], options['todos'], options['seed'])
+            with loadtest.Instrumentation() as instrumentation:
+                responses, seconds = benchmark.run(interface, requests, options['concurrency'])
+        return {
+            'mode': mode,
+            'database': connection.vendor,
+            'concurrency': options['concurrency'],
+            'seconds': seconds,
+            'endpoints': loadtest.report(responses, seconds, instrumentation),
+        }
+
+    def write_table(self, result):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{result["mode"]} on {result["database"]}, {result["concurrency"]} clients, '
+            f'{result["seconds"]:.2f}s'
+        ))
+        self.stdout.write(
+            f'{"endpoint":<10}{"requests":>9}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}'
+            f'{"p99 ms":>9}{"errors":>8}{"locked":>8}{"queries":>9}{"q/req":>7}'
+        )
+        for name, row in result['endpoints'].items():
+            self.stdout.write(
+                f'{name:<10}{row["requests"]:>9}{row["rps"]:>9.1f}{row["p50_ms"]:>9.2f}'
+                f'{row["p95_ms"]:>9.2f}{row["p99_ms"]:>9.2f}{row["error_rate"]:>8.1%}'
+                f'{row["lock_rate"]:>8.1%}{row["queries"]:>9}{row["queries_per_request"]:>7.2f}'
+            )
+        self.stdout.write('')
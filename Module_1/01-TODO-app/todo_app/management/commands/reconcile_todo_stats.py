@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from todo_app import dashboard
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount the dashboard statistics from the todo table and correct '
+        'any TodoSummary rows that have drifted, e.g. after raw SQL writes.'
+    )
+
+    def handle(self, *args, **options):
+        corrected = dashboard.reconcile()
+        self.stdout.write(self.style.SUCCESS(f'Corrected {corrected} summary row(s)'))
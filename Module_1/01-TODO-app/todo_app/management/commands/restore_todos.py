@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_app import archive
+from todo_app.models import ArchivedTodo
+
+
+class Command(BaseCommand):
+    help = 'Move archived todos back into the todo list, keeping their ids.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='+', type=int, help='Ids of the archived todos.')
+
+    def handle(self, *args, **options):
+        archived = list(ArchivedTodo.objects.filter(pk__in=options['ids']))
+        missing = set(options['ids']) - {todo.pk for todo in archived}
+        if missing:
+            raise CommandError(f'No archived todos with ids {", ".join(map(str, sorted(missing)))}')
+        restored = archive.restore(archived)
+        self.stdout.write(self.style.SUCCESS(f'Restored {restored} todos'))
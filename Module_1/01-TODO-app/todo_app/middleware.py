@@ -0,0 +1,77 @@
+import random
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import profiling
+
+
+class RequestProfilingMiddleware:
+    """Time sampled requests and report where the time went.
+
+    For each sampled request this records wall time, SQL query count and
+    time, template render time and the slowest queries, adds a
+    Server-Timing header and appends a RequestProfile to
+    profiling.buffer. Requests that are not sampled cost one random()
+    call. Enabled with TODO_PROFILING_ENABLED; the share of requests
+    sampled is TODO_PROFILING_SAMPLE_RATE.
+
+    Both sync and async capable, so under ASGI it does not force the
+    middleware stack (and every request) through a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        profiling.instrument_templates()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        with self.profile(request) as profile:
+            response = self.get_response(request)
+        return self.report(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        with self.profile(request) as profile:
+            response = await self.get_response(request)
+        return self.report(request, response, profile)
+
+    def sampled(self):
+        return random.random() < getattr(settings, 'TODO_PROFILING_SAMPLE_RATE', 1.0)
+
+    @contextmanager
+    def profile(self, request):
+        """Collect a RequestProfile for the request handled in the block."""
+        profile = profiling.RequestProfile(route='', method=request.method, status=0, wall_ms=0.0)
+        token = profiling.current.set(profile)
+        start = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            profile.wall_ms = (time.perf_counter() - start) * 1000
+            profile.slow_queries = sorted(profile.slow_queries, reverse=True)
+            profiling.current.reset(token)
+
+    def report(self, request, response, profile):
+        profile.status = response.status_code
+        match = request.resolver_match
+        profile.route = '/' + match.route if match else request.path
+        profiling.buffer.append(profile)
+
+        response['Server-Timing'] = ', '.join([
+            f'app;dur={profile.wall_ms:.1f}',
+            f'sql;dur={profile.sql_ms:.1f};desc="{profile.sql_count} queries"',
+            f'tpl;dur={profile.template_ms:.1f}',
+        ])
+        return response
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:11
+
+from django.db import migrations, models
+
+FTS_TABLE = 'todo_app_todo_fts'
+GIN_INDEX = 'todo_search_gin_idx'
+
+# External-content FTS5 table over todo_app_todo, kept in sync by triggers.
+# SQLite drops triggers when Django remakes a table, so a later migration
+# that alters todo_app_todo on SQLite has to recreate them.
+SQLITE_CREATE = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"title, description, content='todo_app_todo', content_rowid='id')",
+    f"""CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON todo_app_todo BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON todo_app_todo BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF title, description ON todo_app_todo BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def _gin_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    # Must match todo_app.models.search_vector() for the planner to use it.
+    return GinIndex(SearchVector('title', 'description', config='english'), name=GIN_INDEX)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_CREATE:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('todo_app', 'Todo'), _gin_index())
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_DROP:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('todo_app', 'Todo'), _gin_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['created_at'], name='todo_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['due_date'], name='todo_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['is_resolved', 'due_date'], name='todo_resolved_due_date_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
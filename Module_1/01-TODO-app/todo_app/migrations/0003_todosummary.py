@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:12
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def build_summaries(apps, schema_editor):
+    Todo = apps.get_model('todo_app', 'Todo')
+    TodoSummary = apps.get_model('todo_app', 'TodoSummary')
+    rows = (
+        Todo.objects.order_by().values('due_date')
+        .annotate(pending=Count('pk', filter=Q(is_resolved=False)), resolved=Count('pk', filter=Q(is_resolved=True)))
+    )
+    TodoSummary.objects.bulk_create(TodoSummary(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0002_todo_indexes_and_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateField(blank=True, null=True, unique=True)),
+                ('pending', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'todo summaries',
+                'ordering': ['due_date'],
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0003_todosummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTodo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-archived_at', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['is_resolved', 'updated_at'], name='todo_resolved_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:51
+
+import datetime
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def merge_undated(apps, schema_editor):
+    # Fold duplicate "no due date" rows left by racing writes into one so
+    # the constraint can be created.
+    TodoSummary = apps.get_model('todo_app', 'TodoSummary')
+    undated = TodoSummary.objects.filter(due_date__isnull=True).order_by('pk')
+    keep = undated.first()
+    if keep is None or undated.count() == 1:
+        return
+    totals = undated.aggregate(pending=Sum('pending'), resolved=Sum('resolved'))
+    undated.exclude(pk=keep.pk).delete()
+    keep.pending, keep.resolved = totals['pending'], totals['resolved']
+    keep.save(update_fields=['pending', 'resolved'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo_app', '0004_archivedtodo'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_undated, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='todosummary',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('due_date', models.Value(datetime.date(1, 1, 1))), condition=models.Q(('due_date__isnull', True)), name='todosummary_single_undated'),
+        ),
+    ]
@@ -1,4 +1,53 @@
-from django.db import models
+import re
+from datetime import date
+
+from django.db import connections, models, router, transaction
+from django.db.models import Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+# SQLite full-text index over title and description, kept in sync with
+# todo_app_todo by triggers (see migration 0002).
+FTS_TABLE = 'todo_app_todo_fts'
+SEARCH_CONFIG = 'english'
+
+
+def search_vector():
+    """The PostgreSQL tsvector expression the GIN search index is built on."""
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector('title', 'description', config=SEARCH_CONFIG)
+
+
+class TodoQuerySet(models.QuerySet):
+    def search(self, terms):
+        """Full-text search over title and description.
+
+        Uses the FTS5 table on SQLite and the GIN-indexed tsvector on
+        PostgreSQL; other databases fall back to icontains.
+        """
+        words = re.findall(r'\w+', terms)
+        if not words:
+            return self.none()
+        vendor = connections[self.db].vendor
+        if vendor == 'sqlite':
+            # Every word must match, as a prefix so "grocer" finds "groceries".
+            match = ' '.join(f'"{word}"*' for word in words)
+            return self.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+            ))
+        if vendor == 'postgresql':
+            from django.contrib.postgres.search import SearchQuery
+            # Same semantics as the FTS5 query: every word, as a prefix.
+            # \w+ words are safe to join into raw tsquery syntax.
+            query = ' & '.join(f'{word}:*' for word in words)
+            return self.alias(search=search_vector()).filter(
+                search=SearchQuery(query, config=SEARCH_CONFIG, search_type='raw')
+            )
+        condition = Q()
+        for word in words:
+            condition &= Q(title__icontains=word) | Q(description__icontains=word)
+        return self.filter(condition)
+
 
 class Todo(models.Model):
     title = models.CharField(max_length=200)
@@ -8,8 +57,93 @@ class Todo(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TodoQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='todo_created_at_idx'),
+            models.Index(fields=['due_date'], name='todo_due_date_idx'),
+            models.Index(fields=['is_resolved', 'due_date'], name='todo_resolved_due_date_idx'),
+            models.Index(fields=['is_resolved', 'updated_at'], name='todo_resolved_updated_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def save(self, *args, **kwargs):
+        # The dashboard signals read the row's current state under a lock
+        # in pre_save (see signals.py); hold it until the UPDATE is done.
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class TodoSummary(models.Model):
+    """Pending and resolved todo counts for one due date (or none).
+
+    Maintained incrementally by todo_app.dashboard as todos change, so the
+    dashboard never has to aggregate over the Todo table.
+    """
+    due_date = models.DateField(null=True, blank=True, unique=True)
+    pending = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['due_date']
+        verbose_name_plural = 'todo summaries'
+        constraints = [
+            # unique=True lets any number of NULLs through, so keep the
+            # "no due date" row single with a partial index of its own
+            # (nulls_distinct=False would only work on PostgreSQL 15+).
+            models.UniqueConstraint(
+                Coalesce('due_date', Value(date.min)),
+                condition=Q(due_date__isnull=True),
+                name='todosummary_single_undated',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.due_date or "No due date"}: {self.pending} pending, {self.resolved} resolved'
+
+
+class ArchivedTodo(models.Model):
+    """A resolved todo moved out of the Todo table by todo_app.archive.
+
+    Keeps the todo's primary key, so a restored todo gets its old id (and
+    URLs) back. Archived todos are resolved by definition.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    due_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-archived_at', '-id']
 
     def __str__(self):
         return self.title
+
+    @classmethod
+    def from_todo(cls, todo):
+        return cls(
+            id=todo.pk,
+            title=todo.title,
+            description=todo.description,
+            due_date=todo.due_date,
+            created_at=todo.created_at,
+            updated_at=todo.updated_at,
+        )
+
+    def to_todo(self):
+        return Todo(
+            id=self.pk,
+            title=self.title,
+            description=self.description,
+            due_date=self.due_date,
+            is_resolved=True,
+            created_at=self.created_at,
+        )
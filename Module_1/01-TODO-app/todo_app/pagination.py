@@ -0,0 +1,64 @@
+"""Pagination for tables too large to COUNT(*) on every page view.
+
+Used by the high-volume admin and the archive page; counts are exact up
+to TODO_ADMIN_COUNT_CAP rows and estimated beyond that.
+"""
+from django.conf import settings
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset, cap):
+    """Count ``queryset`` without scanning more than ``cap`` rows.
+
+    On PostgreSQL an unfiltered table is sized from the planner statistics
+    in pg_class. Everything else is counted exactly up to ``cap``, so a
+    huge result reports ``cap`` rows.
+    """
+    connection = connections[queryset.db]
+    if not queryset.query.where and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been analyzed.
+        if row and row[0] > cap:
+            return row[0]
+    return queryset.order_by()[:cap].count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count is an estimate (or capped), not exact.
+
+    num_pages is only as good as the count, so it is treated as a lower
+    bound: pages past it are served while they have rows, and each one
+    reached extends num_pages by the next page if there is one.
+    """
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list, settings.TODO_ADMIN_COUNT_CAP)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            number = int(number)
+            if number < 1:
+                raise
+            return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if number < self.num_pages:
+            return super().page(number)
+        # From the estimated last page on, fetch one extra row to find out
+        # whether there is a next page instead of trusting the count.
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not object_list and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        self.num_pages = number + 1 if len(object_list) > self.per_page else number
+        return self._get_page(object_list[:self.per_page], number, self)
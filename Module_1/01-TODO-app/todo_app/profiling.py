@@ -0,0 +1,164 @@
+"""Per-request timing records and the rolling buffer they are kept in.
+
+RequestProfilingMiddleware (see middleware.py) appends one RequestProfile
+per sampled request; the staff performance panel reads them back as
+per-route percentiles and the slowest queries seen.
+"""
+import contextvars
+import heapq
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+
+@dataclass
+class RequestProfile:
+    route: str
+    method: str
+    status: int
+    wall_ms: float
+    sql_count: int = 0
+    sql_ms: float = 0.0
+    template_ms: float = 0.0
+    # (duration in ms, SQL) of the slowest queries, slowest first (a heap
+    # while the request is running).
+    slow_queries: list = field(default_factory=list)
+
+
+class ProfileBuffer:
+    """Thread-safe ring buffer holding the most recent profiles."""
+
+    def __init__(self, size):
+        self._profiles = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def append(self, profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._profiles)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+buffer = ProfileBuffer(getattr(settings, 'TODO_PROFILING_BUFFER_SIZE', 1000))
+
+# The profile of the sampled request being handled, if any. A context
+# variable rather than a thread-local: under ASGI, sync_to_async carries it
+# into the threads that query and render.
+current = contextvars.ContextVar('todo_profile', default=None)
+_rendering = contextvars.ContextVar('todo_profile_rendering', default=False)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current profile."""
+    profile = current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        profile.sql_count += 1
+        profile.sql_ms += ms
+        keep = getattr(settings, 'TODO_PROFILING_SLOW_QUERIES', 5)
+        if len(profile.slow_queries) < keep:
+            heapq.heappush(profile.slow_queries, (ms, sql))
+        elif keep:
+            heapq.heappushpop(profile.slow_queries, (ms, sql))
+
+
+def _instrument_connection(sender, connection, **kwargs):
+    # First, so that execute_wrapper() blocks open at connect time pop
+    # their own wrapper rather than this one.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def instrument_queries():
+    """Wrap every database connection with record_query as it connects.
+
+    Connections belong to the thread that opened them, and under ASGI the
+    ORM runs in other threads than the middleware, so the wrapper is
+    installed on each connection for good rather than per request. Outside
+    a sampled request it costs one context variable lookup per query.
+    """
+    connection_created.connect(_instrument_connection, dispatch_uid='todo_profiling')
+
+
+def instrument_templates():
+    """Add every template render to the current profile's template_ms.
+
+    Wraps Template.render once per process; outside a sampled request the
+    wrapper costs one context variable lookup. Nested renders (includes,
+    render_to_string in tags) count towards the outermost one only.
+    """
+    render = Template.render
+    if getattr(render, 'profiled', False):
+        return
+
+    def profiled_render(self, context):
+        profile = current.get()
+        if profile is None or _rendering.get():
+            return render(self, context)
+        token = _rendering.set(True)
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.template_ms += (time.perf_counter() - start) * 1000
+            _rendering.reset(token)
+
+    profiled_render.profiled = True
+    Template.render = profiled_render
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def route_stats(profiles):
+    """Aggregate profiles per (method, route), slowest p95 first."""
+    grouped = {}
+    for profile in profiles:
+        grouped.setdefault((profile.method, profile.route), []).append(profile)
+
+    rows = []
+    for (method, route), route_profiles in grouped.items():
+        count = len(route_profiles)
+        wall = sorted(profile.wall_ms for profile in route_profiles)
+        rows.append({
+            'method': method,
+            'route': route,
+            'count': count,
+            'p50_ms': percentile(wall, 0.50),
+            'p95_ms': percentile(wall, 0.95),
+            'sql_count': sum(profile.sql_count for profile in route_profiles) / count,
+            'sql_ms': sum(profile.sql_ms for profile in route_profiles) / count,
+            'template_ms': sum(profile.template_ms for profile in route_profiles) / count,
+        })
+    return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+
+def worst_queries(profiles, limit=10):
+    """Return the slowest individual queries as dicts, slowest first."""
+    queries = [
+        {'ms': ms, 'sql': sql, 'method': profile.method, 'route': profile.route}
+        for profile in profiles
+        for ms, sql in profile.slow_queries
+    ]
+    return sorted(queries, key=lambda query: query['ms'], reverse=True)[:limit]
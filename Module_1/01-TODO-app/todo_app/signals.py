@@ -0,0 +1,66 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import caching, dashboard, events
+from .models import Todo
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+def invalidate_todo_cache(sender, instance, **kwargs):
+    caching.after_commit(caching.invalidate_todos, [instance.pk])
+
+
+@receiver(pre_save, sender=Todo)
+@receiver(pre_delete, sender=Todo)
+def load_todo_state(sender, instance, **kwargs):
+    # The counters must move from the state this write replaces, which
+    # another request may have changed since the instance was loaded, so
+    # read it under the row lock that Todo.save() and Model.delete() hold
+    # until their write. None means the row is already gone. Callers that
+    # loaded the todo under that lock may set _dashboard_state themselves.
+    if instance._state.adding or hasattr(instance, '_dashboard_state'):
+        return
+    instance._dashboard_state = (
+        Todo.objects.select_for_update()
+        .filter(pk=instance.pk)
+        .values_list('due_date', 'is_resolved')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Todo)
+def update_dashboard_on_save(sender, instance, created, **kwargs):
+    old = instance.__dict__.pop('_dashboard_state', None)
+    dashboard.apply(dashboard.changes_for(None if created else old, dashboard.state(instance)))
+
+
+@receiver(post_delete, sender=Todo)
+def update_dashboard_on_delete(sender, instance, **kwargs):
+    old = instance.__dict__.pop('_dashboard_state', None)
+    dashboard.apply(dashboard.changes_for(old, None))
+
+
+# Fields the toggle views save, which is how a toggle is told apart from
+# an edit.
+TOGGLE_FIELDS = frozenset({'is_resolved', 'updated_at'})
+
+
+@receiver(post_save, sender=Todo)
+def publish_todo_saved(sender, instance, created, update_fields, **kwargs):
+    if created:
+        kind = 'create'
+    elif update_fields == TOGGLE_FIELDS:
+        kind = 'toggle'
+    else:
+        kind = 'update'
+    transaction.on_commit(partial(events.publish, kind, instance.pk, instance))
+
+
+@receiver(post_delete, sender=Todo)
+def publish_todo_deleted(sender, instance, **kwargs):
+    # The pk is cleared once the delete finishes, so bind it now.
+    transaction.on_commit(partial(events.publish, 'delete', instance.pk))
@@ -0,0 +1,125 @@
+// Progressive enhancement for the todo list. Toggle, delete and quick-add
+// ask the server for a fragment (X-Requested-With: XMLHttpRequest) and
+// patch only the affected item and the dashboard. Without JavaScript, or
+// if a request fails, the links and forms fall back to full page loads.
+(function () {
+    'use strict';
+
+    var list = document.getElementById('todo-items');
+    if (!list || !window.fetch || !('content' in document.createElement('template'))) {
+        return;
+    }
+
+    function csrfToken() {
+        // The list page is cached, so the token comes from the cookie that
+        // the list view always sets rather than from the HTML.
+        var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+        return match ? decodeURIComponent(match[1]) : '';
+    }
+
+    function send(url, options) {
+        options.credentials = 'same-origin';
+        options.headers = {'X-Requested-With': 'XMLHttpRequest', 'X-CSRFToken': csrfToken()};
+        return fetch(url, options).then(function (response) {
+            if (!response.ok) {
+                throw new Error('HTTP ' + response.status);
+            }
+            return response.status === 204 ? '' : response.text();
+        });
+    }
+
+    // Replace each page element that shares an id with a top-level element
+    // of the fragment; return the fragment elements with no match.
+    function swap(html) {
+        var template = document.createElement('template');
+        template.innerHTML = html;
+        // Copy the live collection first: replaceWith() moves elements out.
+        return Array.prototype.slice.call(template.content.children).filter(function (element) {
+            var current = element.id && document.getElementById(element.id);
+            if (current) {
+                current.replaceWith(element);
+                return false;
+            }
+            return true;
+        });
+    }
+
+    list.addEventListener('click', function (event) {
+        var link = event.target.closest('a[data-action]');
+        if (!link) {
+            return;
+        }
+        var item = link.closest('.todo-item');
+        event.preventDefault();
+        if (link.dataset.action === 'delete') {
+            if (!window.confirm('Delete "' + item.dataset.title + '"?')) {
+                return;
+            }
+            send(link.href, {method: 'POST'}).then(function () {
+                item.remove();
+            }).catch(function () {
+                window.location.href = link.href;
+            });
+        } else {
+            send(link.href, {method: 'GET'}).then(swap).catch(function () {
+                window.location.href = link.href;
+            });
+        }
+    });
+
+    function removeEmptyMessage() {
+        var empty = document.getElementById('todo-empty');
+        if (empty) {
+            empty.remove();
+        }
+    }
+
+    // Changes made by other people arrive over server-sent events (ASGI
+    // only; under WSGI the endpoint answers 204 and EventSource gives up).
+    if (list.dataset.events && window.EventSource) {
+        var source = new EventSource(list.dataset.events);
+        ['create', 'update', 'toggle'].forEach(function (kind) {
+            source.addEventListener(kind, function (event) {
+                var data = JSON.parse(event.data);
+                var added = swap(data.html + data.dashboard);
+                if (kind === 'create') {
+                    added.reverse().forEach(function (element) {
+                        list.prepend(element);
+                    });
+                    removeEmptyMessage();
+                }
+            });
+        });
+        source.addEventListener('delete', function (event) {
+            var data = JSON.parse(event.data);
+            var item = document.getElementById('todo-' + data.id);
+            if (item) {
+                item.remove();
+            }
+            swap(data.dashboard);
+        });
+        source.addEventListener('reset', function () {
+            // Events were dropped, so the page can no longer be patched.
+            source.close();
+            window.location.reload();
+        });
+    }
+
+    var form = document.getElementById('todo-quick-add');
+    if (form) {
+        form.hidden = false;
+        form.addEventListener('submit', function (event) {
+            event.preventDefault();
+            send(form.action, {method: 'POST', body: new FormData(form)}).then(function (html) {
+                swap(html).reverse().forEach(function (element) {
+                    list.prepend(element);
+                });
+                removeEmptyMessage();
+                form.reset();
+            }).catch(function () {
+                // Let the full create page show what went wrong.
+                window.location.href = form.action;
+            });
+        });
+    }
+})();
@@ -0,0 +1,70 @@
+"""The server-sent event stream of todo changes, as a bare ASGI app.
+
+myproject/asgi.py routes the ``todo_events`` path here ahead of Django,
+so the stream skips the middleware stack: GZipMiddleware would buffer
+it, and each open stream would otherwise hold a request through every
+middleware for its whole life. Under WSGI the same URL reaches
+views.events_unavailable, whose 204 tells EventSource not to retry.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+
+from . import events
+
+HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    # Stop nginx and similar proxies from buffering the stream.
+    (b'x-accel-buffering', b'no'),
+]
+RETRY_MS = 3000
+
+
+def frame(message):
+    """An SSE frame for a message from events.message()."""
+    return f'event: {json.loads(message)["type"]}\ndata: {message}\n\n'.encode()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def event_stream(scope, receive, send):
+    if scope['method'] != 'GET':
+        await send({'type': 'http.response.start', 'status': 405, 'headers': [(b'allow', b'GET')]})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    events.backend.start()
+    subscription = events.hub.subscribe()
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': HEADERS})
+        await send({'type': 'http.response.body', 'body': f'retry: {RETRY_MS}\n\n'.encode(), 'more_body': True})
+        while True:
+            received = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                {received, disconnected},
+                timeout=settings.TODO_EVENTS_KEEPALIVE,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                received.cancel()
+                return
+            if received not in done:
+                # A comment line keeps proxies from timing the stream out.
+                received.cancel()
+                body = b': keepalive\n\n'
+            elif (message := received.result()) is None:
+                # Fell too far behind: have the page reload its state.
+                await send({'type': 'http.response.body', 'body': b'event: reset\ndata: {}\n\n'})
+                return
+            else:
+                body = frame(message)
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        events.hub.unsubscribe(subscription)
+        disconnected.cancel()
@@ -0,0 +1,32 @@
+from django import template
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .. import caching
+
+register = template.Library()
+
+
+@register.simple_tag
+def cached_todo_items(todos):
+    """Render todo rows, reusing the cached fragments where there are any.
+
+    All fragments are fetched with one cache read and the missing ones
+    stored with one write, however many rows there are.
+    """
+    generation = caching.item_generation()
+    contents = caching.get_items([todo.pk for todo in todos], generation)
+    rendered = {
+        todo.pk: render_to_string('todo_app/_todo_item.html', {'todo': todo})
+        for todo in todos
+        if todo.pk not in contents
+    }
+    caching.set_items(rendered, generation)
+    contents.update(rendered)
+    return mark_safe('\n'.join(contents[todo.pk] for todo in todos))
+
+
+@register.simple_tag
+def cached_todo_item(todo):
+    """Render one todo row, reusing its cached fragment when there is one."""
+    return cached_todo_items([todo])
@@ -0,0 +1,179 @@
+"""Query-count and latency regression tests for the todo views.
+
+Every view gets a fixed query budget that must not grow with the number
+of todos, which is what catches N+1 queries. When TODO_PERF_BASELINE
+names a JSON baseline, each view is also timed with the test client; the
+fastest of several runs, which is far less noisy than the mean or median,
+is compared to the baseline and the test fails once it is slower by more
+than the tolerance. Without a baseline the latency test is skipped.
+
+Environment variables (read with python-decouple, like the settings):
+
+    TODO_PERF_ROWS             todos seeded before each test (default 200)
+    TODO_PERF_RUNS             timed requests per view (default 15)
+    TODO_PERF_TOLERANCE        allowed slowdown, 0.5 = 50% (default 1.0)
+    TODO_PERF_SLACK_MS         extra absolute allowance so millisecond-fast
+                               views do not fail on timer noise (default 1.0)
+    TODO_PERF_BASELINE         baseline file; enables the latency test
+    TODO_PERF_UPDATE_BASELINE  record this run's timings in the baseline
+                               instead of comparing against it
+
+Record a baseline on a quiet machine first, e.g.
+
+    TODO_PERF_BASELINE=perf_baseline.json TODO_PERF_UPDATE_BASELINE=1 \
+        python manage.py test todo_app.test_performance
+
+Skip this module with ``manage.py test --exclude-tag=performance``.
+"""
+import json
+import time
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings, tag
+from django.urls import reverse
+
+from . import dashboard
+from .models import Todo
+from .tests import TodoTestCase
+
+ROWS = config('TODO_PERF_ROWS', default=200, cast=int)
+RUNS = config('TODO_PERF_RUNS', default=15, cast=int)
+TOLERANCE = config('TODO_PERF_TOLERANCE', default=1.0, cast=float)
+SLACK_MS = config('TODO_PERF_SLACK_MS', default=1.0, cast=float)
+BASELINE_PATH = config('TODO_PERF_BASELINE', default='', cast=lambda value: Path(value) if value else None)
+UPDATE_BASELINE = config('TODO_PERF_UPDATE_BASELINE', default=False, cast=bool)
+
+# Each delete view consumes a todo per request (once for the query budget,
+# a warm-up plus RUNS for the latency test), and the first todo is kept.
+MIN_ROWS = 2 * ((RUNS + 1) if BASELINE_PATH else 1) + 1
+if ROWS < MIN_ROWS:
+    raise ImproperlyConfigured(
+        f'TODO_PERF_ROWS must be at least {MIN_ROWS} with TODO_PERF_RUNS={RUNS}, not {ROWS}.'
+    )
+
+# Queries per request, independent of the number of todos. Writes include
+# one UPDATE of the dashboard counters per due date they touch; updates and
+# deletes also re-read the row under its lock (toggles load it that way).
+QUERY_BUDGETS = {
+    'list': 2,
+    'create': 2,
+    'update': 4,
+    'toggle': 3,
+    'delete': 4,
+    # Fragment responses for todos.js also read the dashboard.
+    'toggle_fragment': 4,
+    'delete_fragment': 4,
+}
+
+
+def make_todos(n, **fields):
+    """Bulk-create ``n`` todos with a realistic mix of field values.
+
+    The mix is the same on every call, so the first todo always has no due
+    date and is resolved, which keeps the query budgets deterministic.
+    """
+    today = date.today()
+    todos = []
+    for i in range(n):
+        todos.append(Todo(
+            title=f'Todo {i}',
+            description='' if i % 3 else f'Description for todo {i}',
+            due_date=None if i % 4 == 0 else today + timedelta(days=i % 30 - 10),
+            is_resolved=i % 5 == 0,
+            **fields,
+        ))
+    todos = Todo.objects.bulk_create(todos)
+    dashboard.apply(dashboard.changes_for_created(todos))
+    return todos
+
+
+@tag('performance')
+@override_settings(TODO_CACHE_ENABLED=False)
+class ViewPerformanceTests(TodoTestCase):
+    """Query budgets and latency baselines for the todo views"""
+
+    timings = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.timings and UPDATE_BASELINE:
+            baseline = _load_baseline()
+            baseline.update(cls.timings)
+            BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+
+    def setUp(self):
+        super().setUp()
+        self.todos = make_todos(ROWS)
+
+    def requests(self):
+        """Yield (view name, callable issuing one request) for every view."""
+        todo, *deletable = self.todos
+        deletable = iter(deletable)
+        yield 'list', lambda: self.client.get(reverse('todo_list'))
+        yield 'create', lambda: self.client.post(reverse('todo_create'), {'title': 'New'})
+        yield 'update', lambda: self.client.post(
+            reverse('todo_update', args=[todo.pk]), {'title': 'Updated'}
+        )
+        yield 'toggle', lambda: self.client.get(reverse('todo_toggle', args=[todo.pk]))
+        yield 'delete', lambda: self.client.post(
+            reverse('todo_delete', args=[next(deletable).pk])
+        )
+        ajax = {'X-Requested-With': 'XMLHttpRequest'}
+        yield 'toggle_fragment', lambda: self.client.get(
+            reverse('todo_toggle', args=[todo.pk]), headers=ajax
+        )
+        yield 'delete_fragment', lambda: self.client.post(
+            reverse('todo_delete', args=[next(deletable).pk]), headers=ajax
+        )
+
+    def test_query_budgets(self):
+        """Test that no view exceeds its query budget"""
+        for name, request in self.requests():
+            with self.subTest(view=name), self.assertNumQueries(QUERY_BUDGETS[name]):
+                response = request()
+                self.assertLess(response.status_code, 400)
+
+    def test_query_budgets_do_not_grow_with_rows(self):
+        """Test that query counts stay the same with ten times the todos"""
+        make_todos(ROWS * 9)
+        self.test_query_budgets()
+
+    @unittest.skipUnless(BASELINE_PATH, 'TODO_PERF_BASELINE is not set')
+    def test_latency_against_baseline(self):
+        """Test that no view got slower than the baseline allows"""
+        baseline = _load_baseline()
+        if not baseline and not UPDATE_BASELINE:
+            self.fail(f'No baseline at {BASELINE_PATH}; record one with TODO_PERF_UPDATE_BASELINE=1')
+        for name, request in self.requests():
+            request()  # warm up
+            samples = []
+            for _ in range(RUNS):
+                start = time.perf_counter()
+                request()
+                samples.append(time.perf_counter() - start)
+            best_ms = min(samples) * 1000
+            self.timings[name] = {'best_ms': round(best_ms, 3), 'rows': ROWS}
+
+            if UPDATE_BASELINE:
+                continue
+            with self.subTest(view=name):
+                expected = baseline.get(name)
+                if not expected or expected.get('rows') != ROWS:
+                    self.fail(f'No baseline for the {name} view with {ROWS} rows; re-record it')
+                limit = expected['best_ms'] * (1 + TOLERANCE) + SLACK_MS
+                self.assertLessEqual(
+                    best_ms, limit,
+                    f'{name} view took {best_ms:.2f} ms, baseline '
+                    f'{expected["best_ms"]:.2f} ms (limit {limit:.2f} ms)',
+                )
+
+
+def _load_baseline():
+    if BASELINE_PATH.exists():
+        return json.loads(BASELINE_PATH.read_text())
+    return {}
@@ -1,8 +1,42 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import runpy
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.paginator import EmptyPage
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.http import Http404, HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from datetime import date, timedelta
-from .models import Todo
+from . import admin as todo_admin, archive, assets, async_views, benchmark, caching, dashboard, events, loadtest, pagination, profiling, transfer, views
+from .middleware import RequestProfilingMiddleware
+from .models import ArchivedTodo, Todo, TodoSummary
+
+
+class TodoTestCase(TestCase):
+    """TestCase that starts every test with an empty cache"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
 
 
 class TodoModelTests(TestCase):
@@ -49,7 +83,7 @@ class TodoModelTests(TestCase):
         self.assertEqual(todos[2], todo1)
 
 
-class TodoListViewTests(TestCase):
+class TodoListViewTests(TodoTestCase):
     """Test cases for the todo list view"""
 
     def test_todo_list_view_with_no_todos(self):
@@ -78,7 +112,7 @@ class TodoListViewTests(TestCase):
         self.assertContains(response, "Resolved")
 
 
-class TodoCreateViewTests(TestCase):
+class TodoCreateViewTests(TodoTestCase):
     """Test cases for creating todos"""
 
     def test_create_todo_view_get(self):
@@ -122,7 +156,7 @@ class TodoCreateViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
 
 
-class TodoUpdateViewTests(TestCase):
+class TodoUpdateViewTests(TodoTestCase):
     """Test cases for updating todos"""
 
     def test_update_todo_view_get(self):
@@ -156,7 +190,7 @@ class TodoUpdateViewTests(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
-class TodoDeleteViewTests(TestCase):
+class TodoDeleteViewTests(TodoTestCase):
     """Test cases for deleting todos"""
 
     def test_delete_todo_view_get(self):
@@ -182,7 +216,7 @@ class TodoDeleteViewTests(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
-class TodoToggleResolvedTests(TestCase):
+class TodoToggleResolvedTests(TodoTestCase):
     """Test cases for toggling todo resolved status"""
 
     def test_toggle_resolved_from_false_to_true(self):
@@ -236,8 +270,20 @@ class TodoURLTests(TestCase):
         url = reverse('todo_toggle', args=[1])
         self.assertEqual(url, '/todos/toggle/1/')
 
+    def test_static_files_served_without_collectstatic(self):
+        """Test that static files work with DEBUG off and nothing collected"""
+        with tempfile.TemporaryDirectory() as empty_root, override_settings(STATIC_ROOT=empty_root):
+            response = self.client.get('/static/todo_app/todos.js')
+            # Consuming the stream closes the file; response.close() would
+            # send request_finished and close the test's database connection.
+            self.assertTrue(b''.join(response.streaming_content))
 
-class TodoIntegrationTests(TestCase):
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(response['Content-Type'], ('text/javascript', 'application/javascript'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+
+class TodoIntegrationTests(TodoTestCase):
     """Integration tests for complete workflows"""
 
     def test_complete_todo_workflow(self):
@@ -284,3 +330,1278 @@ class TodoIntegrationTests(TestCase):
         response = self.client.get(reverse('todo_list'))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "No Description")
+
+
+class TodoCacheTests(TodoTestCase):
+    """Test cases for list page and fragment caching"""
+
+    def test_list_page_served_from_cache(self):
+        """Test that a repeated list request is served without queries"""
+        Todo.objects.create(title="Cached Todo")
+        self.client.get(reverse('todo_list'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, "Cached Todo")
+        self.assertEqual(caching.get_stats()['page']['hits'], 1)
+
+    def test_save_invalidates_page_and_fragment(self):
+        """Test that editing a todo replaces its cached fragment"""
+        todo = Todo.objects.create(title="Old Title")
+        self.client.get(reverse('todo_list'))
+        self.assertIsNotNone(cache.get(caching.item_key(todo.pk)))
+
+        todo.title = "New Title"
+        todo.save()
+        self.assertIsNone(cache.get(caching.item_key(todo.pk)))
+
+        response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, "New Title")
+        self.assertNotContains(response, "Old Title")
+
+    def test_delete_invalidates_page(self):
+        """Test that deleting a todo removes it from the cached page"""
+        todo = Todo.objects.create(title="Short Lived")
+        self.client.get(reverse('todo_list'))
+
+        todo.delete()
+        response = self.client.get(reverse('todo_list'))
+        self.assertNotContains(response, "Short Lived")
+
+    def test_pages_cached_before_commit_are_expired(self):
+        """Test that a page cached while a save was uncommitted goes stale"""
+        todo = Todo.objects.create(title="Racing Todo")
+        request = RequestFactory().get(reverse('todo_list'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            todo.is_resolved = True
+            todo.save()
+            # Another request renders from the pre-commit rows meanwhile.
+            caching.set_page(request, b"stale page")
+            dashboard_key = dashboard._cache_key(timezone.localdate())
+            cache.set(dashboard_key, {'pending': 0})
+
+        self.assertIsNone(caching.get_page(request))
+        self.assertIsNone(cache.get(dashboard_key))
+
+    def test_unchanged_fragments_are_reused(self):
+        """Test that other todos keep their fragments when one changes"""
+        kept = Todo.objects.create(title="Kept")
+        changed = Todo.objects.create(title="Changed")
+        self.client.get(reverse('todo_list'))
+
+        changed.save()
+        caching.reset_stats()
+        self.client.get(reverse('todo_list'))
+
+        stats = caching.get_stats()
+        self.assertEqual(stats['page']['misses'], 1)
+        self.assertEqual(stats['item'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+        self.assertIsNotNone(cache.get(caching.item_key(kept.pk)))
+
+    def test_fragments_read_and_written_in_one_call(self):
+        """Test that a list render costs the same cache calls for any row count"""
+        for i in range(30):
+            Todo.objects.create(title=f"Todo {i}")
+        for expected_sets in (1, 0):
+            cache.delete(caching.page_key(RequestFactory().get(reverse('todo_list'))))
+            with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+                with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+                    self.client.get(reverse('todo_list'))
+            self.assertEqual(get_many.call_count, 1)
+            self.assertEqual(set_many.call_count, expected_sets)
+        self.assertEqual(caching.get_stats()['item'], {'hits': 30, 'misses': 30, 'hit_rate': 0.5})
+
+    def test_query_strings_share_the_cached_page(self):
+        """Test that arbitrary query strings do not create new page entries"""
+        self.client.get(reverse('todo_list'))
+        self.client.get(reverse('todo_list'), {'x': 'random'})
+        self.assertEqual(caching.get_stats()['page'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_cache_stats_view(self):
+        """Test that hit-rate counters are exposed as JSON"""
+        self.client.get(reverse('todo_list'))
+        self.client.get(reverse('todo_list'))
+
+        response = self.client.get(reverse('todo_cache_stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['page'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    @override_settings(TODO_CACHE_ENABLED=False)
+    def test_caching_can_be_disabled(self):
+        """Test that no pages are cached when caching is disabled"""
+        self.client.get(reverse('todo_list'))
+        response = self.client.get(reverse('todo_list'))
+
+        self.assertIn('todos', response.context)
+        self.assertEqual(caching.get_stats()['page']['hits'], 0)
+
+
+class DatabaseConfigTests(TestCase):
+    """Test cases for the environment-driven database configuration"""
+
+    def test_connections_are_health_checked(self):
+        """Test that reused connections are health-checked"""
+        self.assertTrue(connection.settings_dict['CONN_HEALTH_CHECKS'])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite only')
+    def test_sqlite_pragmas_applied_on_connect(self):
+        """Test that synchronous and busy_timeout pragmas are set"""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite only')
+    def test_sqlite_file_database_uses_wal(self):
+        """Test that an on-disk database is switched to WAL journaling"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            settings_dict = {**connection.settings_dict, 'NAME': os.path.join(tmpdir, 'wal.sqlite3')}
+            wrapper = type(connections['default'])(settings_dict, alias='wal_check')
+            try:
+                with wrapper.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone()[0].lower(), 'wal')
+            finally:
+                wrapper.close()
+
+    def test_asgi_does_not_persist_connections_by_default(self):
+        """Test that DB_CONN_MAX_AGE defaults to 0 when serving ASGI"""
+        with mock.patch.dict(os.environ, {'SERVER_INTERFACE': 'asgi'}):
+            os.environ.pop('DB_CONN_MAX_AGE', None)
+            values = runpy.run_path(str(settings.BASE_DIR / 'myproject' / 'settings.py'))
+        self.assertEqual(values['DB_CONN_MAX_AGE'], 0)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+    def test_postgresql_persistent_or_pooled_connections(self):
+        """Test that PostgreSQL either pools or keeps connections open"""
+        settings_dict = connection.settings_dict
+        if settings_dict['OPTIONS'].get('pool'):
+            self.assertEqual(settings_dict['CONN_MAX_AGE'], 0)
+            self.assertIsNotNone(connection.pool)
+        else:
+            self.assertGreater(settings_dict['CONN_MAX_AGE'], 0)
+
+
+class AsyncViewTests(TodoTestCase):
+    """Test cases for the async todo views"""
+
+    def setUp(self):
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+
+    async def test_async_list_view(self):
+        """Test that the async list view renders every todo"""
+        await Todo.objects.acreate(title="Async Todo 1")
+        await Todo.objects.acreate(title="Async Todo 2")
+
+        response = await async_views.todo_list(self.factory.get('/todos/'))
+        self.assertContains(response, "Async Todo 1")
+        self.assertContains(response, "Async Todo 2")
+
+    async def test_async_list_view_keeps_cache_io_off_the_event_loop(self):
+        """Test that the async list reads and writes the cache in a worker thread"""
+        await Todo.objects.acreate(title="Async Todo")
+        threads = set()
+
+        def spy(method):
+            def wrapper(*args, **kwargs):
+                threads.add(threading.current_thread())
+                return method(*args, **kwargs)
+            return wrapper
+
+        with mock.patch.multiple(
+            cache, get=spy(cache.get), get_many=spy(cache.get_many), set=spy(cache.set)
+        ):
+            for _ in range(2):  # a miss, then a hit
+                response = await async_views.todo_list(self.factory.get('/todos/'))
+                self.assertContains(response, "Async Todo")
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    async def test_async_create_view(self):
+        """Test creating a todo through the async view"""
+        request = self.factory.post('/todos/create/', {'title': 'Created Async'})
+        response = await async_views.todo_create(request)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, reverse('todo_list'))
+        self.assertTrue(await Todo.objects.filter(title='Created Async').aexists())
+
+    async def test_async_create_view_rejects_missing_title(self):
+        """Test that the async create view redisplays an invalid form"""
+        request = self.factory.post('/todos/create/', {'description': 'No title'})
+        response = await async_views.todo_create(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await Todo.objects.acount(), 0)
+
+    async def test_async_create_view_rejects_invalid_fragment_request(self):
+        """Test that an invalid quick-add answers 400 so todos.js falls back"""
+        request = self.factory.post(
+            '/todos/create/', {'title': ''}, headers={'X-Requested-With': 'XMLHttpRequest'}
+        )
+        response = await async_views.todo_create(request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', json.loads(response.content)['errors'])
+
+    async def test_async_update_view(self):
+        """Test updating a todo through the async view"""
+        todo = await Todo.objects.acreate(title="Original")
+        request = self.factory.post(
+            f'/todos/update/{todo.pk}/', {'title': 'Updated', 'is_resolved': True}
+        )
+        response = await async_views.todo_update(request, pk=todo.pk)
+
+        self.assertEqual(response.status_code, 302)
+        await todo.arefresh_from_db()
+        self.assertEqual(todo.title, 'Updated')
+        self.assertTrue(todo.is_resolved)
+
+    async def test_async_update_view_get(self):
+        """Test that the async update view shows the existing data"""
+        todo = await Todo.objects.acreate(title="Editable")
+        response = await async_views.todo_update(self.factory.get('/'), pk=todo.pk)
+        self.assertContains(response, "Editable")
+        self.assertContains(response, "Edit Todo")
+
+    async def test_async_delete_view(self):
+        """Test the async delete confirmation and deletion"""
+        todo = await Todo.objects.acreate(title="Doomed")
+        response = await async_views.todo_delete(self.factory.get('/'), pk=todo.pk)
+        self.assertContains(response, "Are you sure")
+
+        response = await async_views.todo_delete(self.factory.post('/'), pk=todo.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(await Todo.objects.aexists())
+
+    async def test_async_toggle_view(self):
+        """Test toggling a todo through the async view"""
+        todo = await Todo.objects.acreate(title="Toggle Me")
+        await async_views.toggle_resolved(self.factory.get('/'), pk=todo.pk)
+
+        await todo.arefresh_from_db()
+        self.assertTrue(todo.is_resolved)
+
+    async def test_async_view_missing_todo(self):
+        """Test that async views raise 404 for unknown todos"""
+        with self.assertRaises(Http404):
+            await async_views.toggle_resolved(self.factory.get('/'), pk=999)
+
+    async def test_async_fragment_responses(self):
+        """Test that async views return fragments when asked, like the sync ones"""
+        ajax = {'headers': {'X-Requested-With': 'XMLHttpRequest'}}
+        request = self.factory.post('/todos/create/', {'title': 'Fragment'}, **ajax)
+        response = await async_views.todo_create(request)
+        self.assertEqual(response.status_code, 201)
+        todo = await Todo.objects.aget(title='Fragment')
+        self.assertContains(response, f'id="todo-{todo.pk}"', status_code=201)
+
+        response = await async_views.toggle_resolved(self.factory.get('/', **ajax), pk=todo.pk)
+        self.assertContains(response, "Mark as Pending")
+
+        response = await async_views.todo_delete(self.factory.post('/', **ajax), pk=todo.pk)
+        self.assertEqual(response.status_code, 204)
+
+
+class TodoTransferTests(TodoTestCase):
+    """Test cases for bulk export and import"""
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def create_todos(self):
+        Todo.objects.create(title="Pending, with comma", description='Line "one"\nline two')
+        Todo.objects.create(title="Resolved", due_date=date(2025, 1, 31), is_resolved=True)
+
+    def assert_round_trip(self, fmt):
+        self.create_todos()
+        path = self.path(f'todos.{fmt}')
+        call_command('export_todos', output=path, stdout=io.StringIO())
+        Todo.objects.all().delete()
+
+        call_command('import_todos', path, stdout=io.StringIO())
+        self.assertQuerySetEqual(
+            Todo.objects.order_by('title').values_list('title', 'description', 'due_date', 'is_resolved'),
+            [
+                ("Pending, with comma", 'Line "one"\nline two', None, False),
+                ("Resolved", '', date(2025, 1, 31), True),
+            ],
+        )
+
+    def test_csv_round_trip(self):
+        """Test that a CSV export imports back to the same todos"""
+        self.assert_round_trip('csv')
+
+    def test_jsonl_round_trip(self):
+        """Test that a JSONL export imports back to the same todos"""
+        self.assert_round_trip('jsonl')
+
+    def test_export_to_stdout(self):
+        """Test that export writes JSON lines to stdout by default"""
+        self.create_todos()
+        out = io.StringIO()
+        call_command('export_todos', format='jsonl', stdout=out)
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['title'] for row in rows], ["Pending, with comma", "Resolved"])
+
+    def test_import_uses_batches(self):
+        """Test that import inserts one bulk_create per batch"""
+        rows = ((i, {'title': f'Todo {i}'}) for i in range(1, 11))
+        # 4 batches x (SAVEPOINT, INSERT, summary UPDATE, RELEASE), plus
+        # creating the summary row on the first batch.
+        with self.assertNumQueries(19):
+            created = transfer.import_rows(rows, batch_size=3)
+        self.assertEqual(created, 10)
+        self.assertEqual(Todo.objects.count(), 10)
+
+    def test_import_invalid_row(self):
+        """Test that an invalid row stops the import with its line number"""
+        path = self.path('bad.csv')
+        with open(path, 'w', newline='') as file:
+            file.write('title,due_date\nGood,2025-01-01\nBad,not-a-date\n')
+
+        with self.assertRaisesMessage(CommandError, 'Line 3: invalid due_date'):
+            call_command('import_todos', path, stdout=io.StringIO())
+        self.assertEqual(Todo.objects.count(), 0)
+
+    def test_import_rejects_malformed_json_rows(self):
+        """Test that valid JSON of the wrong shape is reported by line"""
+        for line, message in (
+            ('[1, 2]', 'expected a JSON object, not list'),
+            ('{"title": "a", "due_date": 20240101}', 'due_date must be a string'),
+            ('{"title": 5}', 'title must be a string'),
+            ('{"title": "a", "description": ["b"]}', 'description must be a string'),
+        ):
+            with self.subTest(line=line), self.assertRaisesMessage(transfer.RowError, f'Line 1: {message}'):
+                transfer.import_rows(transfer.read_rows('jsonl', io.StringIO(line + '\n')))
+        self.assertEqual(Todo.objects.count(), 0)
+
+    def test_import_error_reports_committed_batches(self):
+        """Test that a failed import says how much was already imported"""
+        path = self.path('partial.jsonl')
+        with open(path, 'w') as file:
+            file.write('{"title": "ok"}\n{"title": ""}\n')
+
+        with self.assertRaisesMessage(CommandError, '1 todos up to line 1 were already imported'):
+            call_command('import_todos', path, batch_size=1, stdout=io.StringIO())
+        self.assertEqual(Todo.objects.count(), 1)
+
+    def test_import_invalidates_list_cache(self):
+        """Test that imported todos show up on a cached list page"""
+        self.client.get(reverse('todo_list'))
+        transfer.import_rows([(1, {'title': 'Imported'})])
+
+        response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, "Imported")
+
+    def test_streaming_export_view(self):
+        """Test that the export view streams a CSV attachment"""
+        self.create_todos()
+        response = self.client.get(reverse('todo_export'))
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment; filename="todos.csv"', response['Content-Disposition'])
+        if response.is_async:
+            # TODO_ASYNC_VIEWS serves the export from an async generator.
+            async def collect():
+                return b''.join([chunk async for chunk in response.streaming_content])
+            content = async_to_sync(collect)().decode()
+        else:
+            content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines()[0], ','.join(transfer.EXPORT_FIELDS))
+        self.assertIn('"Pending, with comma"', content)
+
+    def test_export_view_unknown_format(self):
+        """Test that an unknown export format returns 404"""
+        response = self.client.get(reverse('todo_export'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_async_streaming_export_view(self):
+        """Test that the async export view streams JSON lines"""
+        await Todo.objects.acreate(title="Async Export")
+        response = await async_views.export_todos(
+            AsyncRequestFactory().get('/todos/export/', {'format': 'jsonl'})
+        )
+
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual(json.loads(lines[0])['title'], "Async Export")
+
+    async def test_sync_export_view_streams_asynchronously_under_asgi(self):
+        """Test that the sync export view does not buffer under ASGI"""
+        await Todo.objects.acreate(title="ASGI Export")
+        request = AsyncRequestFactory().get('/todos/export/', {'format': 'jsonl'})
+        response = views.export_todos(request)
+
+        self.assertTrue(response.is_async)
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual(json.loads(lines[0])['title'], "ASGI Export")
+
+
+class LoadTestTests(TestCase):
+    """Test cases for the load-test workload and instrumentation"""
+
+    def test_parse_mix_normalizes_weights(self):
+        """Test that endpoint weights are normalized to fractions"""
+        self.assertEqual(loadtest.parse_mix('list=3,delete=1'), {'list': 0.75, 'delete': 0.25})
+
+    def test_parse_mix_rejects_unknown_endpoint(self):
+        """Test that an unknown endpoint in the mix is rejected"""
+        with self.assertRaisesMessage(ValueError, "Unknown endpoint 'search'"):
+            loadtest.parse_mix('list=1,search=1')
+
+    def test_build_requests_follows_mix(self):
+        """Test that requests follow the mix and never delete a todo twice"""
+        mix = loadtest.parse_mix('list=50,toggle=25,delete=25')
+        requests = loadtest.build_requests(mix, 200, seed_todos=10)
+
+        self.assertEqual(len(requests), 200)
+        self.assertEqual({request.name for request in requests}, {'list', 'toggle', 'delete'})
+        delete_paths = [request.path for request in requests if request.name == 'delete']
+        self.assertEqual(len(delete_paths), len(set(delete_paths)))
+        toggle_paths = {request.path for request in requests if request.name == 'toggle'}
+        self.assertFalse(toggle_paths & {path.replace('delete', 'toggle') for path in delete_paths})
+        self.assertGreater(Todo.objects.count(), len(delete_paths))
+        self.assertEqual(dashboard.reconcile(), 0)
+
+    def test_instrumentation_counts_queries_per_endpoint(self):
+        """Test that queries are attributed to the current endpoint"""
+        with loadtest.Instrumentation() as instrumentation:
+            token = benchmark.current_request.set('list')
+            try:
+                list(Todo.objects.all())
+                Todo.objects.count()
+            finally:
+                benchmark.current_request.reset(token)
+            Todo.objects.count()  # outside any request: not counted
+
+        self.assertEqual(instrumentation.queries, {'list': 2})
+
+    def test_lock_errors_are_recognized(self):
+        """Test that SQLite and PostgreSQL lock failures are recognized"""
+        self.assertTrue(loadtest.is_lock_error(OperationalError('database is locked')))
+        self.assertTrue(loadtest.is_lock_error(OperationalError('deadlock detected')))
+        self.assertFalse(loadtest.is_lock_error(OperationalError('no such table: todo')))
+
+    def test_report_percentiles(self):
+        """Test per-endpoint latency percentiles and rates"""
+        responses = [benchmark.Response('list', 200, ms / 1000) for ms in range(1, 101)]
+        responses.append(benchmark.Response('create', 500, 0.5))
+        instrumentation = loadtest.Instrumentation()
+        instrumentation.lock_errors['create'] = 1
+
+        rows = loadtest.report(responses, 2.0, instrumentation)
+        self.assertEqual(rows['list']['p50_ms'], 50)
+        self.assertEqual(rows['list']['p95_ms'], 95)
+        self.assertEqual(rows['list']['rps'], 50)
+        self.assertEqual(rows['create']['error_rate'], 1.0)
+        self.assertEqual(rows['create']['lock_rate'], 1.0)
+        self.assertEqual(rows['all']['requests'], 101)
+
+
+PROFILED_MIDDLEWARE = ['todo_app.middleware.RequestProfilingMiddleware', *settings.MIDDLEWARE]
+
+
+@override_settings(
+    MIDDLEWARE=PROFILED_MIDDLEWARE,
+    TODO_PROFILING_ENABLED=True,
+    TODO_PROFILING_SAMPLE_RATE=1.0,
+    TODO_CACHE_ENABLED=False,
+)
+class RequestProfilingTests(TodoTestCase):
+    """Test cases for the request profiling middleware and panel"""
+
+    def setUp(self):
+        super().setUp()
+        profiling.buffer.clear()
+        self.addCleanup(profiling.buffer.clear)
+
+    def test_server_timing_header(self):
+        """Test that profiled responses carry a Server-Timing header"""
+        Todo.objects.create(title="Profiled")
+        response = self.client.get(reverse('todo_list'))
+
+        timing = response['Server-Timing']
+        self.assertIn('app;dur=', timing)
+        self.assertIn('sql;dur=', timing)
+        self.assertIn('desc="2 queries"', timing)  # todos and dashboard
+        self.assertIn('tpl;dur=', timing)
+
+    def test_profile_recorded_in_buffer(self):
+        """Test that each request is recorded with its route and queries"""
+        todo = Todo.objects.create(title="Profiled")
+        self.client.get(reverse('todo_list'))
+        self.client.get(reverse('todo_toggle', args=[todo.pk]))
+
+        list_profile, toggle_profile = profiling.buffer.snapshot()
+        self.assertEqual(list_profile.route, '/todos/')
+        self.assertEqual(list_profile.sql_count, 2)
+        self.assertGreater(list_profile.template_ms, 0)
+        self.assertEqual(toggle_profile.route, '/todos/toggle/<int:pk>/')
+        self.assertEqual(toggle_profile.status, 302)
+        self.assertEqual(len(toggle_profile.slow_queries), 3)
+
+    def test_render_shortcut_time_is_recorded(self):
+        """Test that views using render() report their template time"""
+        todo = Todo.objects.create(title="Profiled")
+        self.client.get(reverse('todo_toggle', args=[todo.pk]), headers={'X-Requested-With': 'XMLHttpRequest'})
+
+        (profile,) = profiling.buffer.snapshot()
+        self.assertGreater(profile.template_ms, 0)
+
+    async def test_async_requests_are_profiled_without_a_thread_hop(self):
+        """Test that the middleware runs natively in an async stack"""
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(asyncio.iscoroutinefunction(RequestProfilingMiddleware(get_response)))
+        await Todo.objects.acreate(title="Profiled")
+        response = await self.async_client.get(reverse('todo_list'))
+
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        (profile,) = await sync_to_async(profiling.buffer.snapshot)()
+        self.assertEqual(profile.sql_count, 2)
+        self.assertGreater(profile.template_ms, 0)
+
+    @override_settings(TODO_PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_profiled(self):
+        """Test that a zero sample rate records nothing"""
+        response = self.client.get(reverse('todo_list'))
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(profiling.buffer.snapshot(), [])
+
+    def test_route_stats(self):
+        """Test per-route percentiles and the worst query list"""
+        for ms in range(1, 21):
+            profiling.buffer.append(profiling.RequestProfile(
+                route='/todos/', method='GET', status=200, wall_ms=ms,
+                sql_count=1, sql_ms=ms / 2, slow_queries=[(ms / 2, f'SELECT {ms}')],
+            ))
+        profiles = profiling.buffer.snapshot()
+
+        [row] = profiling.route_stats(profiles)
+        self.assertEqual(row['count'], 20)
+        self.assertEqual(row['p50_ms'], 10)
+        self.assertEqual(row['p95_ms'], 19)
+        worst = profiling.worst_queries(profiles, limit=2)
+        self.assertEqual([query['sql'] for query in worst], ['SELECT 20', 'SELECT 19'])
+
+    def test_panel_requires_staff(self):
+        """Test that the performance panel is staff-only"""
+        response = self.client.get(reverse('todo_performance_panel'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/admin/login/', response.url)
+
+    def test_panel_shows_routes(self):
+        """Test that staff see per-route timings on the panel"""
+        self.client.get(reverse('todo_list'))
+        staff = User.objects.create_user('staff', password='pw', is_staff=True)
+        self.client.force_login(staff)
+
+        response = self.client.get(reverse('todo_performance_panel'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "GET /todos/")
+        self.assertContains(response, "Slowest queries")
+
+
+class TodoSearchTests(TestCase):
+    """Test cases for indexed full-text search"""
+
+    def setUp(self):
+        self.groceries = Todo.objects.create(title="Buy groceries", description="Milk and eggs")
+        self.report = Todo.objects.create(title="Write report", description="Quarterly numbers")
+
+    def test_search_title_and_description(self):
+        """Test that search matches words in the title or description"""
+        self.assertQuerySetEqual(Todo.objects.search("groceries"), [self.groceries])
+        self.assertQuerySetEqual(Todo.objects.search("quarterly"), [self.report])
+
+    def test_search_requires_every_word(self):
+        """Test that all search words must match"""
+        self.assertQuerySetEqual(Todo.objects.search("milk eggs"), [self.groceries])
+        self.assertQuerySetEqual(Todo.objects.search("milk numbers"), [])
+
+    def test_search_follows_updates_and_deletes(self):
+        """Test that the search index is kept in sync with the table"""
+        self.groceries.title = "Buy vegetables"
+        self.groceries.save()
+        self.report.delete()
+
+        self.assertQuerySetEqual(Todo.objects.search("vegetables"), [self.groceries])
+        self.assertQuerySetEqual(Todo.objects.search("report"), [])
+
+    def test_search_without_words(self):
+        """Test that punctuation-only searches match nothing"""
+        self.assertQuerySetEqual(Todo.objects.search('"*'), [])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite only')
+    def test_sqlite_search_uses_fts_index(self):
+        """Test that SQLite search goes through the FTS5 table"""
+        with CaptureQueriesContext(connection) as queries:
+            list(Todo.objects.search("groceries"))
+        self.assertIn('todo_app_todo_fts MATCH', queries[0]['sql'])
+
+
+class TodoAdminTests(TodoTestCase):
+    """Test cases for the todo admin bulk actions and high-volume mode"""
+
+    def setUp(self):
+        super().setUp()
+        self.superuser = User.objects.create_superuser('admin', password='pw')
+        self.client.force_login(self.superuser)
+
+    def test_bulk_action_is_single_update(self):
+        """Test that marking todos resolved runs one UPDATE"""
+        todos = [Todo.objects.create(title=f"Todo {i}") for i in range(3)]
+        self.client.get(reverse('todo_list'))
+        data = {'action': 'mark_resolved', '_selected_action': [todo.pk for todo in todos]}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('admin:todo_app_todo_changelist'), data)
+        self.assertEqual(response.status_code, 302)
+        updates = [query for query in queries if query['sql'].startswith('UPDATE "todo_app_todo"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Todo.objects.filter(is_resolved=True).count(), 3)
+
+        response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, "Mark as Pending", count=3)
+
+    def test_estimated_count_is_capped(self):
+        """Test that estimated counts stop scanning at the cap"""
+        for i in range(5):
+            Todo.objects.create(title=f"Todo {i}")
+        self.assertEqual(pagination.estimated_count(Todo.objects.all(), cap=3), 3)
+        self.assertEqual(pagination.estimated_count(Todo.objects.all(), cap=10), 5)
+
+    @override_settings(TODO_ADMIN_COUNT_CAP=2)
+    def test_estimated_paginator_serves_pages_past_the_cap(self):
+        """Test that pages past a capped count are still reachable"""
+        for i in range(5):
+            Todo.objects.create(title=f"Todo {i}")
+        paginator = pagination.EstimatedCountPaginator(Todo.objects.order_by('pk'), 1)
+        self.assertEqual(paginator.num_pages, 2)
+
+        page = paginator.page(4)
+        self.assertEqual([todo.title for todo in page], ["Todo 3"])
+        self.assertTrue(page.has_next())
+        page = paginator.page(5)
+        self.assertEqual([todo.title for todo in page], ["Todo 4"])
+        self.assertFalse(page.has_next())
+        with self.assertRaises(EmptyPage):
+            paginator.page(6)
+
+    @override_settings(TODO_ADMIN_COUNT_CAP=2)
+    def test_high_volume_changelist_pages_past_the_cap(self):
+        """Test that the changelist does not redirect pages past the cap"""
+        for i in range(5):
+            Todo.objects.create(title=f"Todo {i}")
+        model_admin = todo_admin.HighVolumeTodoAdmin(Todo, admin.site)
+        model_admin.list_per_page = 1
+        request = RequestFactory().get('/admin/todo_app/todo/', {'p': 4, 'o': '1'})
+        request.user = self.superuser
+        response = model_admin.changelist_view(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([todo.title for todo in response.context_data['cl'].result_list], ["Todo 3"])
+
+    def changelist(self, **params):
+        request = RequestFactory().get('/admin/todo_app/todo/', params)
+        request.user = self.superuser
+        model_admin = todo_admin.HighVolumeTodoAdmin(Todo, admin.site)
+        with CaptureQueriesContext(connection) as queries:
+            response = model_admin.changelist_view(request)
+            response.render()
+        return response, [query['sql'] for query in queries]
+
+    @override_settings(TODO_ADMIN_COUNT_CAP=2)
+    def test_high_volume_changelist_avoids_full_count(self):
+        """Test that the high-volume changelist never counts the whole table"""
+        for i in range(5):
+            Todo.objects.create(title=f"Todo {i}", due_date=date(2025, 1, i + 1))
+        response, queries = self.changelist()
+
+        self.assertEqual(response.status_code, 200)
+        counts = [sql for sql in queries if 'COUNT(' in sql]
+        self.assertTrue(counts)
+        for sql in counts:
+            self.assertIn('LIMIT 2', sql)
+        self.assertEqual(response.context_data['cl'].result_count, 2)
+
+    def test_high_volume_changelist_search(self):
+        """Test that high-volume admin search uses the full-text index"""
+        Todo.objects.create(title="Buy groceries")
+        Todo.objects.create(title="Write report")
+        response, queries = self.changelist(q='grocer')
+
+        self.assertEqual(list(response.context_data['cl'].result_list.values_list('title', flat=True)), ["Buy groceries"])
+        if connection.vendor == 'sqlite':
+            self.assertTrue(any('MATCH' in sql for sql in queries))
+
+
+class TodoDashboardTests(TodoTestCase):
+    """Test cases for the incrementally maintained dashboard statistics"""
+
+    def assertCountersMatchTable(self):
+        self.assertEqual(dashboard.reconcile(), 0)
+
+    def test_counters_follow_single_writes(self):
+        """Test that create, toggle, edit and delete keep the counters exact"""
+        yesterday = timezone.localdate() - timedelta(days=1)
+        todo = Todo.objects.create(title="Overdue", due_date=yesterday)
+        Todo.objects.create(title="Undated")
+        self.assertEqual(dashboard.get_dashboard()['overdue'], 1)
+
+        self.client.get(reverse('todo_toggle', args=[todo.pk]))
+        stats = dashboard.get_dashboard()
+        self.assertEqual((stats['pending'], stats['resolved'], stats['overdue']), (1, 1, 0))
+
+        self.client.post(reverse('todo_update', args=[todo.pk]), {'title': "Moved"})
+        self.assertEqual(TodoSummary.objects.get(due_date=None).pending, 2)
+        self.assertCountersMatchTable()
+
+        self.client.post(reverse('todo_delete', args=[todo.pk]))
+        self.assertEqual(dashboard.get_dashboard()['pending'], 1)
+        self.assertCountersMatchTable()
+
+    def test_single_undated_summary(self):
+        """Test that there can only be one "no due date" summary row"""
+        Todo.objects.create(title="Undated")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TodoSummary.objects.create(due_date=None, pending=1)
+        self.assertEqual(dashboard.get_dashboard()['histogram'][0]['pending'], 1)
+
+    def test_counters_follow_bulk_writes(self):
+        """Test that imports and admin bulk actions update the counters"""
+        rows = ((i, {'title': f'Todo {i}', 'due_date': '2025-01-01'}) for i in range(1, 6))
+        transfer.import_rows(rows, batch_size=2)
+        self.assertEqual(TodoSummary.objects.get(due_date=date(2025, 1, 1)).pending, 5)
+
+        self.client.force_login(User.objects.create_superuser('admin', password='pw'))
+        pks = list(Todo.objects.values_list('pk', flat=True)[:3])
+        data = {'action': 'mark_resolved', '_selected_action': pks}
+        self.client.post(reverse('admin:todo_app_todo_changelist'), data)
+        self.client.post(reverse('admin:todo_app_todo_changelist'), data)  # no-op
+
+        self.assertEqual(dashboard.get_dashboard()['resolved'], 3)
+        self.assertCountersMatchTable()
+
+    def test_counters_follow_the_replaced_state(self):
+        """Test that writes through stale instances keep the counters exact"""
+        todo = Todo.objects.create(title="Raced")
+        stale_edit = Todo.objects.get(pk=todo.pk)
+        stale_delete = Todo.objects.get(pk=todo.pk)
+
+        # Both were loaded while the todo was pending.
+        self.client.get(reverse('todo_toggle', args=[todo.pk]))
+        stale_edit.title = "Edited"
+        stale_edit.save()
+        self.assertCountersMatchTable()
+
+        self.client.get(reverse('todo_toggle', args=[todo.pk]))
+        stale_delete.delete()
+        stale_edit.delete()  # already gone
+        self.assertCountersMatchTable()
+        self.assertEqual(dashboard.get_dashboard()['pending'], 0)
+
+    def test_drifted_counters_do_not_break_the_dashboard(self):
+        """Test that negative counters are shown as zero"""
+        TodoSummary.objects.create(due_date=None, pending=-1, resolved=1)
+        TodoSummary.objects.create(due_date=date(2020, 1, 1), pending=-2)
+
+        stats = dashboard.compute(timezone.localdate())
+        self.assertEqual((stats['pending'], stats['resolved'], stats['overdue']), (0, 1, 0))
+        self.assertEqual(stats['histogram'], [
+            {'label': 'No due date', 'pending': 0, 'resolved': 1, 'percent': 100},
+        ])
+
+    def test_list_page_shows_dashboard(self):
+        """Test that the list page renders the totals and histogram"""
+        today = timezone.localdate()
+        Todo.objects.create(title="Late", due_date=today - timedelta(days=3))
+        Todo.objects.create(title="Soon", due_date=today + timedelta(days=2))
+        response = self.client.get(reverse('todo_list'))
+
+        self.assertEqual(response.context['dashboard']['overdue'], 1)
+        labels = [bucket['label'] for bucket in response.context['dashboard']['histogram']]
+        self.assertEqual(labels, ['Overdue', today + timedelta(days=2)])
+        self.assertContains(response, '<strong>1</strong> overdue', html=False)
+
+    def test_dashboard_is_cached(self):
+        """Test that a cached dashboard costs no queries"""
+        Todo.objects.create(title="Todo")
+        dashboard.get_dashboard()
+        with self.assertNumQueries(0):
+            dashboard.get_dashboard()
+
+    def test_reconcile_repairs_drift(self):
+        """Test that reconcile_todo_stats rebuilds drifted counters"""
+        Todo.objects.create(title="Pending", due_date=date(2025, 1, 1))
+        Todo.objects.create(title="Resolved", is_resolved=True)
+        TodoSummary.objects.update(pending=99, resolved=99)
+        TodoSummary.objects.create(due_date=date(2030, 1, 1), pending=4)
+
+        out = io.StringIO()
+        call_command('reconcile_todo_stats', stdout=out)
+        self.assertIn('Corrected 3 summary row(s)', out.getvalue())
+        self.assertCountEqual(
+            TodoSummary.objects.values_list('due_date', 'pending', 'resolved'),
+            [(None, 0, 1), (date(2025, 1, 1), 1, 0)],
+        )
+
+
+class TodoArchiveTests(TodoTestCase):
+    """Test cases for archiving resolved todos and restoring them"""
+
+    def setUp(self):
+        super().setUp()
+        self.old = [
+            Todo.objects.create(title=f"Old {i}", is_resolved=True, due_date=date(2025, 1, 1))
+            for i in range(5)
+        ]
+        self.recent = Todo.objects.create(title="Recent", is_resolved=True)
+        self.pending = Todo.objects.create(title="Pending")
+        Todo.objects.filter(pk__in=[self.pending.pk] + [todo.pk for todo in self.old]).update(
+            updated_at=timezone.now() - timedelta(days=40)
+        )
+
+    def test_archive_moves_old_resolved_todos(self):
+        """Test that only resolved todos past the cutoff are archived"""
+        out = io.StringIO()
+        call_command('archive_todos', days=30, batch_size=2, stdout=out)
+
+        self.assertIn('Archived 5 todos', out.getvalue())
+        self.assertCountEqual(Todo.objects.values_list('title', flat=True), ["Recent", "Pending"])
+        archived = ArchivedTodo.objects.get(pk=self.old[0].pk)
+        self.assertEqual(archived.title, "Old 0")
+        self.assertEqual(archived.created_at, self.old[0].created_at)
+        self.assertEqual(dashboard.reconcile(), 0)
+
+    def test_archive_updates_counters_once_per_batch(self):
+        """Test that a batch costs the same queries however many rows it has"""
+        # SAVEPOINT, SELECT, INSERT, DELETE, summary UPDATE, RELEASE, then
+        # the empty SELECT that ends the loop (also inside a savepoint).
+        with mock.patch.object(events, 'publish') as publish, self.assertNumQueries(9):
+            self.assertEqual(archive.archive_resolved(30), 5)
+        publish.assert_not_called()
+        self.assertEqual(TodoSummary.objects.get(due_date=date(2025, 1, 1)).resolved, 0)
+
+    def test_archive_sends_no_delete_signals(self):
+        """Test that archived rows are deleted without per-row delete signals"""
+        receiver = mock.Mock()
+        pre_delete.connect(receiver, sender=Todo)
+        post_delete.connect(receiver, sender=Todo)
+        self.addCleanup(pre_delete.disconnect, receiver, sender=Todo)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Todo)
+
+        self.assertEqual(archive.archive_resolved(30), 5)
+        receiver.assert_not_called()
+        self.assertFalse(Todo.objects.filter(pk__in=[todo.pk for todo in self.old]).exists())
+
+    def test_archive_page_avoids_full_count(self):
+        """Test that the archive page counts at most the cap and pages past it"""
+        archive.archive_resolved(30)
+        with override_settings(TODO_ADMIN_COUNT_CAP=2), mock.patch.object(views.ArchivedTodoListView, 'paginate_by', 1):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('todo_archive'), {'page': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['archived_todos']), 1)
+        self.assertContains(response, "Older")
+        for sql in [query['sql'] for query in queries if 'COUNT(' in query['sql']]:
+            self.assertIn('LIMIT 2', sql)
+
+    def test_dry_run_changes_nothing(self):
+        """Test that --dry-run only counts"""
+        out = io.StringIO()
+        call_command('archive_todos', days=30, dry_run=True, stdout=out)
+        self.assertIn('Would archive 5 todos', out.getvalue())
+        self.assertEqual(Todo.objects.count(), 7)
+
+    def test_list_reads_archive_only_on_request(self):
+        """Test that archived todos leave the list and appear in the archive"""
+        self.client.get(reverse('todo_list'))
+        archive.archive_resolved(30)
+
+        response = self.client.get(reverse('todo_list'))
+        self.assertNotContains(response, "Old 0")
+        response = self.client.get(reverse('todo_archive'))
+        self.assertContains(response, "Old 0")
+        self.assertNotContains(response, "Recent")
+
+    def test_restore_keeps_id_and_created_at(self):
+        """Test that restoring brings back the original todo"""
+        archive.archive_resolved(30)
+        todo = self.old[0]
+        self.assertEqual(self.client.get(reverse('todo_restore', args=[todo.pk])).status_code, 405)
+
+        response = self.client.post(reverse('todo_restore', args=[todo.pk]))
+        self.assertRedirects(response, reverse('todo_list'))
+        restored = Todo.objects.get(pk=todo.pk)
+        self.assertTrue(restored.is_resolved)
+        self.assertEqual(restored.created_at, todo.created_at)
+        self.assertFalse(ArchivedTodo.objects.filter(pk=todo.pk).exists())
+        self.assertContains(self.client.get(reverse('todo_list')), "Old 0")
+        self.assertEqual(dashboard.reconcile(), 0)
+
+    def test_restore_command(self):
+        """Test that restore_todos restores by id and rejects unknown ids"""
+        archive.archive_resolved(30)
+        with self.assertRaises(CommandError):
+            call_command('restore_todos', self.old[0].pk, 999999)
+        out = io.StringIO()
+        call_command('restore_todos', self.old[0].pk, self.old[1].pk, stdout=out)
+        self.assertIn('Restored 2 todos', out.getvalue())
+        self.assertEqual(ArchivedTodo.objects.count(), 3)
+
+
+class TodoFragmentTests(TodoTestCase):
+    """Test cases for the partial-page responses used by todos.js"""
+
+    ajax = {'headers': {'X-Requested-With': 'XMLHttpRequest'}}
+
+    def setUp(self):
+        super().setUp()
+        for i in range(20):
+            Todo.objects.create(title=f"Other {i}")
+        self.todo = Todo.objects.create(title="Target")
+
+    def test_toggle_returns_item_and_dashboard(self):
+        """Test that toggle returns only the changed item and the dashboard"""
+        response = self.client.get(reverse('todo_toggle', args=[self.todo.pk]), **self.ajax)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'id="todo-{self.todo.pk}"')
+        self.assertContains(response, "Mark as Pending")
+        self.assertContains(response, 'id="dashboard"')
+        self.assertContains(response, '<strong>1</strong> resolved', html=False)
+        self.assertNotContains(response, "Other 0")
+
+    def test_create_returns_new_item(self):
+        """Test that create answers 201 with the new item"""
+        response = self.client.post(reverse('todo_create'), {'title': "Quick"}, **self.ajax)
+
+        todo = Todo.objects.get(title="Quick")
+        self.assertContains(response, f'id="todo-{todo.pk}"', status_code=201)
+        self.assertNotContains(response, "Other 0", status_code=201)
+
+    def test_invalid_create_returns_bad_request(self):
+        """Test that an invalid quick-add answers 400 so todos.js falls back"""
+        response = self.client.post(reverse('todo_create'), {'title': ""}, **self.ajax)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()['errors'])
+
+    def test_delete_returns_no_content(self):
+        """Test that delete answers 204 with an empty body"""
+        response = self.client.post(reverse('todo_delete', args=[self.todo.pk]), **self.ajax)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.content, b'')
+        self.assertFalse(Todo.objects.filter(pk=self.todo.pk).exists())
+
+    def test_plain_requests_still_redirect(self):
+        """Test that requests without the header keep the full-page flow"""
+        response = self.client.get(reverse('todo_toggle', args=[self.todo.pk]))
+        self.assertRedirects(response, reverse('todo_list'))
+
+    def test_cached_list_sets_csrf_cookie(self):
+        """Test that the CSRF cookie is set even when the page comes from cache"""
+        self.client.get(reverse('todo_list'))
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.get(reverse('todo_list'))
+        self.assertIn('csrftoken', response.cookies)
+
+        token = response.cookies['csrftoken'].value
+        response = client.post(
+            reverse('todo_delete', args=[self.todo.pk]),
+            headers={'X-Requested-With': 'XMLHttpRequest', 'X-CSRFToken': token},
+        )
+        self.assertEqual(response.status_code, 204)
+
+
+class ResponseCompressionTests(TodoTestCase):
+    """Test cases for gzip and conditional GET on dynamic pages"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(30):
+            Todo.objects.create(title=f"Todo {i}", description="A fairly ordinary description")
+
+    def test_list_page_is_gzipped(self):
+        """Test that the list page is compressed for clients that accept gzip"""
+        plain = self.client.get(reverse('todo_list'))
+        compressed = self.client.get(reverse('todo_list'), headers={'Accept-Encoding': 'gzip'})
+
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed['Vary'])
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertLess(len(compressed.content), len(plain.content) / 4)
+
+    def test_unchanged_page_is_not_modified(self):
+        """Test that a repeated request with the ETag gets an empty 304"""
+        response = self.client.get(reverse('todo_list'))
+        response = self.client.get(reverse('todo_list'), headers={'If-None-Match': response['ETag']})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+
+class StaticPipelineTests(TodoTestCase):
+    """Test cases for hashed, precompressed static files"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        static_root = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(
+            STATIC_ROOT=static_root,
+            STORAGES={
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'todo_app.assets.CompressedManifestStaticFilesStorage'},
+            },
+        ))
+        call_command('collectstatic', interactive=False, ignore_patterns=['admin'], verbosity=0)
+        cls.hashed = staticfiles_storage.stored_name('todo_app/todos.css')
+
+    def serve(self, path, **headers):
+        response = assets.serve(RequestFactory().get(f'/static/{path}', headers=headers), path)
+        # Not response.close(): that sends request_finished, which closes
+        # the test's database connection.
+        self.addCleanup(response.file_to_stream.close)
+        return response
+
+    def read(self, name):
+        with staticfiles_storage.open(name) as stored:
+            return stored.read()
+
+    def test_collectstatic_writes_compressed_variants(self):
+        """Test that collectstatic stores a smaller gzip copy of each hashed asset"""
+        self.assertRegex(self.hashed, r'^todo_app/todos\.[0-9a-f]{12}\.css$')
+        original = self.read(self.hashed)
+        compressed = self.read(self.hashed + '.gz')
+
+        self.assertEqual(gzip.decompress(compressed), original)
+        self.assertLess(len(compressed), len(original) / 2)
+
+    def test_pages_link_hashed_names(self):
+        """Test that templates reference the fingerprinted file"""
+        response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, f'/static/{self.hashed}')
+
+    def test_hashed_file_is_immutable_and_precompressed(self):
+        """Test that hashed names are served gzipped with immutable caching"""
+        response = self.serve(self.hashed, **{'Accept-Encoding': 'gzip, deflate'})
+
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn(f'max-age={assets.IMMUTABLE_MAX_AGE}', response['Cache-Control'])
+        self.assertEqual(
+            b''.join(response.streaming_content),
+            self.read(self.hashed + '.gz'),
+        )
+
+    def test_unhashed_name_is_not_immutable(self):
+        """Test that unhashed names are sent plain and cached briefly"""
+        response = self.serve('todo_app/todos.css', **{'Accept-Encoding': 'gzip;q=0'})
+
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_missing_files_are_404(self):
+        """Test that unknown paths and paths outside STATIC_ROOT are rejected"""
+        for path in ('todo_app/missing.css', '../manage.py', '../../todo_app/views.py'):
+            with self.subTest(path=path), self.assertRaises(Http404):
+                self.serve(path)
+
+
+class RecordingBackend(events.LocalBackend):
+    """Event backend that keeps every published event for inspection."""
+
+    def __init__(self):
+        super().__init__(events.Hub())
+        self.events = []
+
+    def has_listeners(self):
+        return True
+
+    def publish(self, message):
+        self.events.append(json.loads(message))
+
+
+class TodoEventTests(TodoTestCase):
+    """Test cases for live updates over server-sent events"""
+
+    def setUp(self):
+        super().setUp()
+        self.backend = RecordingBackend()
+        self.enterContext(mock.patch.object(events, 'backend', self.backend))
+
+    def test_changes_publish_events(self):
+        """Test that create, edit, toggle and delete each publish one event"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('todo_create'), {'title': "Shared"})
+        todo = Todo.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('todo_update', args=[todo.pk]), {'title': "Shared, edited"})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('todo_toggle', args=[todo.pk]))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('todo_delete', args=[todo.pk]))
+
+        self.assertEqual(
+            [event['type'] for event in self.backend.events],
+            ['create', 'update', 'toggle', 'delete'],
+        )
+        self.assertTrue(all(event['id'] == todo.pk for event in self.backend.events))
+        self.assertIn(f'id="todo-{todo.pk}"', self.backend.events[0]['html'])
+        self.assertIn("Mark as Pending", self.backend.events[2]['html'])
+        self.assertNotIn('html', self.backend.events[3])
+        self.assertIn('<strong>0</strong> pending', self.backend.events[3]['dashboard'])
+
+    def test_nothing_rendered_without_listeners(self):
+        """Test that publishing with no open streams costs nothing"""
+        todo = Todo.objects.create(title="Unwatched")
+        with mock.patch.object(events, 'backend', events.LocalBackend(events.Hub())):
+            with self.assertNumQueries(0):
+                events.publish('update', todo.pk, todo)
+
+    def test_redis_listener_reconnects(self):
+        """Test that the Redis listener backs off and resubscribes after errors"""
+        class Stop(BaseException):
+            pass
+
+        def pubsub(messages=(), error=ConnectionError('Redis went away'), subscribe=None):
+            def listen():
+                yield from messages
+                raise error
+            return mock.Mock(listen=listen, subscribe=mock.Mock(side_effect=subscribe))
+
+        hub = mock.Mock()
+        client = mock.Mock()
+        client.pubsub.side_effect = [
+            pubsub(subscribe=ConnectionError('Connection refused')),
+            pubsub(subscribe=ConnectionError('Connection refused')),
+            pubsub([{'data': b'{"type": "update"}'}]),
+            pubsub(error=Stop()),
+        ]
+        backend = events.RedisBackend(hub, channel='todos', client=client)
+
+        with mock.patch.object(events.time, 'sleep') as sleep, self.assertLogs(events.logger) as logs:
+            with self.assertRaises(Stop):
+                backend._listen()
+
+        hub.deliver.assert_called_once_with('{"type": "update"}')
+        # The delay doubles while failing and resets once subscribed again.
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [1, 2, 1])
+        self.assertEqual(len(logs.records), 3)
+
+    def test_redis_publish_does_not_wait_for_redis(self):
+        """Test that Redis publishing happens off the writing thread"""
+        release = threading.Event()
+        client = mock.Mock()
+        client.publish.side_effect = lambda channel, message: release.wait(5)
+        backend = events.RedisBackend(mock.Mock(), channel='todos', client=client)
+
+        # Both return while the first PUBLISH is still stuck.
+        backend.publish('first')
+        backend.publish('second')
+        release.set()
+        backend._outbox.join()
+        self.assertEqual([call.args for call in client.publish.call_args_list], [('todos', 'first'), ('todos', 'second')])
+
+    def test_redis_clients_have_timeouts(self):
+        """Test that the Redis publishing client cannot block indefinitely"""
+        redis = mock.Mock()
+        with mock.patch.dict(sys.modules, redis=redis):
+            events.RedisBackend(mock.Mock(), url='redis://redis:6379/0', channel='todos')
+        publish_kwargs, listen_kwargs = [call.kwargs for call in redis.Redis.from_url.call_args_list]
+        self.assertEqual(publish_kwargs['socket_timeout'], events.SOCKET_TIMEOUT)
+        self.assertEqual(publish_kwargs['socket_connect_timeout'], events.SOCKET_TIMEOUT)
+        self.assertEqual(listen_kwargs['socket_connect_timeout'], events.SOCKET_TIMEOUT)
+
+    def test_wsgi_endpoint_stops_reconnects(self):
+        """Test that the events URL answers 204 outside the ASGI app"""
+        response = self.client.get(reverse('todo_events'))
+        self.assertEqual(response.status_code, 204)
+
+
+class EventStreamTests(TodoTestCase):
+    """Test cases for the hub and the SSE endpoint in myproject/asgi.py"""
+
+    async def test_hub_delivers_across_threads(self):
+        """Test that messages published from a worker thread reach the loop"""
+        hub = events.Hub()
+        subscription = hub.subscribe()
+        await asyncio.to_thread(hub.deliver, 'hello')
+        self.assertEqual(await asyncio.wait_for(subscription.get(), 1), 'hello')
+
+    async def test_slow_subscriber_is_reset(self):
+        """Test that a subscriber that falls behind gets a reset"""
+        subscription = events.Hub().subscribe()
+        for i in range(events.QUEUE_SIZE + 5):
+            subscription.offer(str(i))
+        messages = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+        self.assertEqual(len(messages), events.QUEUE_SIZE)
+        self.assertIsNone(messages[-1])
+
+    async def open_stream(self, method='GET'):
+        from myproject.asgi import application
+
+        sent = asyncio.Queue()
+        self.disconnect = asyncio.Event()
+
+        async def receive():
+            await self.disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        scope = {'type': 'http', 'method': method, 'path': reverse('todo_events'), 'headers': []}
+        self.stream = asyncio.create_task(application(scope, receive, sent.put))
+        return sent
+
+    async def close_stream(self):
+        self.disconnect.set()
+        await asyncio.wait_for(self.stream, 1)
+
+    async def test_stream_sends_events(self):
+        """Test that the ASGI app streams hub messages as SSE frames"""
+        sent = await self.open_stream()
+        start = await asyncio.wait_for(sent.get(), 1)
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream; charset=utf-8'), start['headers'])
+        self.assertEqual((await asyncio.wait_for(sent.get(), 1))['body'], b'retry: 3000\n\n')
+
+        message = json.dumps({'type': 'toggle', 'id': 1, 'html': '<div></div>', 'dashboard': ''})
+        await asyncio.to_thread(events.hub.deliver, message)
+        body = (await asyncio.wait_for(sent.get(), 1))['body']
+        self.assertEqual(body, f'event: toggle\ndata: {message}\n\n'.encode())
+
+        await self.close_stream()
+        self.assertEqual(events.hub.listeners, 0)
+
+    @override_settings(TODO_EVENTS_KEEPALIVE=0.01)
+    async def test_stream_keepalive(self):
+        """Test that an idle stream sends comment lines"""
+        sent = await self.open_stream()
+        for _ in range(3):
+            message = await asyncio.wait_for(sent.get(), 1)
+        self.assertEqual(message['body'], b': keepalive\n\n')
+        self.assertTrue(message['more_body'])
+        await self.close_stream()
+
+    async def test_stream_rejects_post(self):
+        """Test that only GET opens a stream"""
+        sent = await self.open_stream(method='POST')
+        self.assertEqual((await asyncio.wait_for(sent.get(), 1))['status'], 405)
+        await self.close_stream()
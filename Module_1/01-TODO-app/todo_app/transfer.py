@@ -0,0 +1,178 @@
+"""Streaming CSV/JSONL export and batched import of todos.
+
+Exports read rows with ``values().iterator(chunk_size)`` (or
+``aiterator`` in async views) and encode one line at a time, so memory
+use does not grow with the table. Imports parse input lazily and insert
+``batch_size`` rows per ``bulk_create`` inside one transaction per batch.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from . import caching, dashboard
+from .models import Todo
+
+FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+EXPORT_FIELDS = ('id', 'title', 'description', 'due_date', 'is_resolved', 'created_at', 'updated_at')
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_BATCH_SIZE = 1000
+
+
+class RowError(ValueError):
+    """Raised for an input row that cannot be turned into a Todo.
+
+    When raised from import_rows(), ``imported`` is the number of todos
+    already committed by earlier batches and ``imported_through`` the input
+    line of the last of them (None if nothing was committed).
+    """
+    imported = 0
+    imported_through = None
+
+    def __init__(self, line, message):
+        super().__init__(f'Line {line}: {message}')
+        self.line = line
+
+
+class Echo:
+    """File-like object whose write() returns the value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+_csv_writer = csv.writer(Echo())
+
+
+def export_queryset():
+    # values() rather than values_list(): ValuesListIterable runs its query
+    # eagerly, which aiterator() cannot hand off to a thread.
+    return Todo.objects.order_by('pk').values(*EXPORT_FIELDS)
+
+
+def format_from_path(path, default='csv'):
+    for fmt in FORMATS:
+        if str(path).endswith(f'.{fmt}'):
+            return fmt
+    return default
+
+
+def encode_header(fmt):
+    return _csv_writer.writerow(EXPORT_FIELDS) if fmt == 'csv' else ''
+
+
+def encode_row(fmt, row):
+    if fmt == 'csv':
+        return _csv_writer.writerow([row[field] for field in EXPORT_FIELDS])
+    return json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the export one encoded line at a time."""
+    header = encode_header(fmt)
+    if header:
+        yield header
+    for row in export_queryset().iterator(chunk_size=chunk_size):
+        yield encode_row(fmt, row)
+
+
+async def aexport_lines(fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Async version of export_lines() for StreamingHttpResponse under ASGI."""
+    header = encode_header(fmt)
+    if header:
+        yield header
+    async for row in export_queryset().aiterator(chunk_size=chunk_size):
+        yield encode_row(fmt, row)
+
+
+def read_rows(fmt, file):
+    """Yield (line number, row dict) pairs from ``file`` without reading it all."""
+    if fmt == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_num, line in enumerate(file, start=1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    raise RowError(line_num, f'invalid JSON ({exc.msg})') from exc
+                if not isinstance(row, dict):
+                    raise RowError(line_num, f'expected a JSON object, not {type(row).__name__}')
+                yield line_num, row
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y', 't')
+
+
+def _text(line_num, row, field):
+    """``row[field]`` as a string; missing and null values are empty."""
+    value = row.get(field)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise RowError(line_num, f'{field} must be a string, not {value!r}')
+    return value
+
+
+def todo_from_row(line_num, row):
+    """Build an unsaved Todo from an export row; ids and timestamps are ignored."""
+    title = _text(line_num, row, 'title').strip()
+    if not title:
+        raise RowError(line_num, 'title is required')
+    due_date = _text(line_num, row, 'due_date').strip() or None
+    if due_date is not None:
+        try:
+            due_date = parse_date(due_date)
+        except ValueError:
+            due_date = None
+        if due_date is None:
+            raise RowError(line_num, f'invalid due_date {row["due_date"]!r}')
+    todo = Todo(
+        title=title,
+        description=_text(line_num, row, 'description'),
+        due_date=due_date,
+        is_resolved=_parse_bool(row.get('is_resolved', False)),
+    )
+    try:
+        todo.clean_fields(exclude=['created_at', 'updated_at'])
+    except ValidationError as exc:
+        raise RowError(line_num, '; '.join(exc.messages)) from exc
+    return todo
+
+
+def import_rows(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Insert todos for ``rows`` in batches; return the number created.
+
+    Each batch is committed in its own transaction, so a bad row aborts
+    only its batch and the ones after it.
+    """
+    todos = ((line_num, todo_from_row(line_num, row)) for line_num, row in rows)
+    created = 0
+    last_line = None
+    try:
+        while batch := list(islice(todos, batch_size)):
+            batch_todos = [todo for _, todo in batch]
+            with transaction.atomic():
+                Todo.objects.bulk_create(batch_todos)
+                dashboard.apply(dashboard.changes_for_created(batch_todos))
+            created += len(batch_todos)
+            last_line = batch[-1][0]
+    except RowError as exc:
+        exc.imported, exc.imported_through = created, last_line
+        raise
+    finally:
+        if created:
+            # bulk_create() sends no post_save signals, so the dashboard
+            # counters are updated per batch above and the pages here.
+            caching.after_commit(caching.invalidate_list)
+    return created
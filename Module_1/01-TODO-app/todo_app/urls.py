@@ -1,10 +1,30 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
-urlpatterns = [
-    path('', views.TodoListView.as_view(), name='todo_list'),
-    path('create/', views.TodoCreateView.as_view(), name='todo_create'),
-    path('update/<int:pk>/', views.TodoUpdateView.as_view(), name='todo_update'),
-    path('delete/<int:pk>/', views.TodoDeleteView.as_view(), name='todo_delete'),
-    path('toggle/<int:pk>/', views.toggle_resolved, name='todo_toggle'),
+if settings.TODO_ASYNC_VIEWS:
+    urlpatterns = [
+        path('', async_views.todo_list, name='todo_list'),
+        path('create/', async_views.todo_create, name='todo_create'),
+        path('update/<int:pk>/', async_views.todo_update, name='todo_update'),
+        path('delete/<int:pk>/', async_views.todo_delete, name='todo_delete'),
+        path('toggle/<int:pk>/', async_views.toggle_resolved, name='todo_toggle'),
+        path('export/', async_views.export_todos, name='todo_export'),
+    ]
+else:
+    urlpatterns = [
+        path('', views.TodoListView.as_view(), name='todo_list'),
+        path('create/', views.TodoCreateView.as_view(), name='todo_create'),
+        path('update/<int:pk>/', views.TodoUpdateView.as_view(), name='todo_update'),
+        path('delete/<int:pk>/', views.TodoDeleteView.as_view(), name='todo_delete'),
+        path('toggle/<int:pk>/', views.toggle_resolved, name='todo_toggle'),
+        path('export/', views.export_todos, name='todo_export'),
+    ]
+
+urlpatterns += [
+    path('events/', views.events_unavailable, name='todo_events'),
+    path('archive/', views.ArchivedTodoListView.as_view(), name='todo_archive'),
+    path('archive/<int:pk>/restore/', views.restore_todo, name='todo_restore'),
+    path('stats/cache/', views.cache_stats, name='todo_cache_stats'),
+    path('perf/', views.performance_panel, name='todo_performance_panel'),
 ]
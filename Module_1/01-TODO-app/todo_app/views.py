@@ -1,19 +1,71 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.http import require_POST
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
-from .models import Todo
+from . import archive, caching, dashboard, profiling, transfer
+from .models import ArchivedTodo, Todo
+from .pagination import EstimatedCountPaginator
 
+def wants_fragment(request):
+    """Whether todos.js asked for a fragment instead of a redirect."""
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+def todo_fragment(request, todo, stats, status=200):
+    """The updated item and dashboard, swapped into the page by id."""
+    return render(
+        request, 'todo_app/_todo_fragment.html', {'todo': todo, 'dashboard': stats}, status=status
+    )
+
+def form_errors(form):
+    """A 400 for an invalid fragment request; todos.js then loads the full form."""
+    return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+
+# The cached page cannot carry a per-user CSRF token, so todos.js reads
+# it from the cookie instead.
+@method_decorator(ensure_csrf_cookie, name='dispatch')
 class TodoListView(ListView):
     model = Todo
     template_name = 'todo_app/todo_list.html'
     context_object_name = 'todos'
 
+    def get(self, request, *args, **kwargs):
+        content = caching.get_page(request)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().get(request, *args, **kwargs)
+        response.add_post_render_callback(
+            lambda rendered: caching.set_page(request, rendered.content)
+        )
+        return response
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('dashboard', dashboard.get_dashboard())
+        return super().get_context_data(**kwargs)
+
 class TodoCreateView(CreateView):
     model = Todo
     template_name = 'todo_app/todo_form.html'
     fields = ['title', 'description', 'due_date']
     success_url = reverse_lazy('todo_list')
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if wants_fragment(self.request):
+            return todo_fragment(self.request, self.object, dashboard.get_dashboard(), status=201)
+        return response
+
+    def form_invalid(self, form):
+        if wants_fragment(self.request):
+            return form_errors(form)
+        return super().form_invalid(form)
+
 class TodoUpdateView(UpdateView):
     model = Todo
     template_name = 'todo_app/todo_form.html'
@@ -25,8 +77,78 @@ class TodoDeleteView(DeleteView):
     template_name = 'todo_app/todo_confirm_delete.html'
     success_url = reverse_lazy('todo_list')
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if wants_fragment(self.request):
+            return HttpResponse(status=204)
+        return response
+
+def toggle_todo(pk):
+    """Flip the status of todo ``pk`` under its row lock; return the todo."""
+    with transaction.atomic(savepoint=False):
+        todo = Todo.objects.select_for_update().filter(pk=pk).first()
+        if todo is not None:
+            # Locked, so this is the state the save replaces (see signals.py).
+            todo._dashboard_state = dashboard.state(todo)
+            todo.is_resolved = not todo.is_resolved
+            todo.save(update_fields=['is_resolved', 'updated_at'])
+    if todo is None:
+        # Raised outside the block, which would otherwise mark an enclosing
+        # transaction for rollback.
+        raise Http404(f'No todo with id {pk}')
+    return todo
+
 def toggle_resolved(request, pk):
-    todo = get_object_or_404(Todo, pk=pk)
-    todo.is_resolved = not todo.is_resolved
-    todo.save()
+    todo = toggle_todo(pk)
+    if wants_fragment(request):
+        return todo_fragment(request, todo, dashboard.get_dashboard())
     return redirect('todo_list')
+
+class ArchivedTodoListView(ListView):
+    model = ArchivedTodo
+    template_name = 'todo_app/todo_archive.html'
+    context_object_name = 'archived_todos'
+    paginate_by = 50
+    # The archive only grows; don't COUNT(*) all of it for every page.
+    paginator_class = EstimatedCountPaginator
+
+@require_POST
+def restore_todo(request, pk):
+    archive.restore([get_object_or_404(ArchivedTodo, pk=pk)])
+    return redirect('todo_list')
+
+def events_unavailable(request):
+    # The event stream is served by myproject/asgi.py; under WSGI a 204
+    # tells EventSource to stop reconnecting.
+    return HttpResponse(status=204)
+
+def cache_stats(request):
+    return JsonResponse(caching.get_stats())
+
+def export_response(request, lines_for_format):
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in transfer.FORMATS:
+        raise Http404(f'Unknown export format {fmt!r}')
+    response = StreamingHttpResponse(
+        lines_for_format(fmt), content_type=transfer.CONTENT_TYPES[fmt]
+    )
+    response['Content-Disposition'] = f'attachment; filename="todos.{fmt}"'
+    return response
+
+def export_todos(request):
+    # Under ASGI, Django drains a synchronous streaming iterator into a
+    # list before sending it, so the whole export would sit in memory.
+    if isinstance(request, ASGIRequest):
+        return export_response(request, transfer.aexport_lines)
+    return export_response(request, transfer.export_lines)
+
+@staff_member_required
+def performance_panel(request):
+    profiles = profiling.buffer.snapshot()
+    return render(request, 'todo_app/performance_panel.html', {
+        'profiling_enabled': settings.TODO_PROFILING_ENABLED,
+        'sample_rate': settings.TODO_PROFILING_SAMPLE_RATE,
+        'profile_count': len(profiles),
+        'routes': profiling.route_stats(profiles),
+        'worst_queries': profiling.worst_queries(profiles),
+    })